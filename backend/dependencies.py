@@ -0,0 +1,75 @@
+"""FastAPI dependencies shared by the routers.
+
+`current_user` resolves the bearer token to a user once per request:
+through the verified-token cache, then local JWT verification, then
+GoTrue as a last resort.
+"""
+from fastapi import Depends, HTTPException, Request, Security
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+import jwt
+import os
+
+from .services.supabase_client import get_supabase
+from .services.token_cache import RevokedTokenError, TokenCache
+from .services.token_verifier import TokenVerifier
+
+# verifies access tokens without a GoTrue round trip; None disables it
+token_verifier = TokenVerifier.from_env(os.environ)
+
+# users of recently verified tokens; entries never outlive the token's exp
+token_cache = TokenCache(
+    max_size=int(os.getenv("TOKEN_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", "300")),
+)
+
+bearer = HTTPBearer()
+
+def get_user_from_token(token: str, fresh: bool = False):
+    """The user a bearer token belongs to.
+
+    Verified tokens are cached, and concurrent requests with the same
+    token share one verification. Tokens are verified locally when
+    possible; Supabase is asked only when that fails, or with
+    `fresh=True` for up-to-date user metadata.
+    """
+    # Remove 'Bearer ' prefix if present
+    if token.startswith('Bearer '):
+        token = token[7:]
+
+    if fresh:
+        if token_cache.is_revoked(token):
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+        return verify_remote(token)
+    try:
+        return token_cache.get_or_verify(token, verify_token)
+    except RevokedTokenError:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+def verify_token(token: str):
+    if token_verifier is not None:
+        try:
+            return token_verifier.user(token)
+        except jwt.InvalidTokenError:
+            pass  # e.g. signed with a key we do not have; Supabase decides
+    return verify_remote(token)
+
+def verify_remote(token: str):
+    try:
+        user_response = get_supabase().auth.get_user(token)
+        if not user_response or not user_response.user:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return user_response.user
+    except Exception as e:
+        print(f"Token validation error: {str(e)}")
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+def bearer_token(credentials: HTTPAuthorizationCredentials = Security(bearer)) -> str:
+    """The raw access token from the Authorization header"""
+    return credentials.credentials
+
+def current_user(request: Request, token: str = Depends(bearer_token)):
+    """The authenticated user, resolved once and kept on request.state"""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        user = request.state.user = get_user_from_token(token)
+    return user
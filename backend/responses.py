@@ -0,0 +1,14 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson.
+
+    Return it from a handler with plain dicts and lists to skip
+    jsonable_encoder and response-model validation; grant listings are
+    large enough for that to matter.
+    """
+
+    def render(self, content):
+        return orjson.dumps(content)
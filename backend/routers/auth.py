@@ -1,18 +1,16 @@
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body
 from pydantic import EmailStr
-from supabase import create_client
-from gotrue.errors import AuthApiError
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from ..dependencies import bearer_token, current_user, token_cache
+from ..services.token_cache import token_expiry
+from ..services.supabase_client import get_supabase, supabase_factory
+
 router = APIRouter()
 
 @router.post('/signup')
 def signup(email: str = Body(...), password: str = Body(...)):
     try:
-        result = supabase.auth.sign_up({"email": email, "password": password})
+        result = supabase_factory.session_client().auth.sign_up({"email": email, "password": password})
         print("SUPABASE SIGNUP RESULT:", result)
 
         return {"message": "Check your email to confirm registration", "user": str(result.user)}
@@ -26,7 +24,7 @@ def signup(email: str = Body(...), password: str = Body(...)):
 @router.post('/login')
 def login(email: str = Body(...), password: str = Body(...)):
     try:
-        result = supabase.auth.sign_in_with_password({"email": email, "password": password})
+        result = supabase_factory.session_client().auth.sign_in_with_password({"email": email, "password": password})
         print("SUPABASE LOGIN RESULT:", result)
 
         return {
@@ -38,3 +36,18 @@ def login(email: str = Body(...), password: str = Body(...)):
         print("Login Error:", str(e))
         raise HTTPException(status_code=401, detail="Invalid login credentials.")
 
+
+@router.post('/logout')
+def logout(user=Depends(current_user), token: str = Depends(bearer_token), supabase=Depends(get_supabase)):
+    """Revoke the caller's access token, here and in Supabase"""
+    # locally verified tokens stay valid until they expire, so the cache
+    # refuses this one from now on (in this worker only). The token was
+    # verified by current_user, so its exp can be trusted.
+    claims = getattr(user, "claims", None) or {}
+    token_cache.revoke(token, claims.get("exp") or token_expiry(token))
+    try:
+        supabase.auth.admin.sign_out(token)
+    except Exception as e:
+        print("Logout Error:", str(e))
+
+    return {"message": "Logged out"}
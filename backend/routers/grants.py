@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+
+from .match_grants import grant_catalog
+from ..responses import ORJSONResponse
+from ..services.grant_catalog import grant_rows
+from ..services.grant_search import GrantSearch
+
+router = APIRouter()
+
+grant_search = GrantSearch(grant_catalog)
+
+@router.get("/grants/search", response_class=ORJSONResponse)
+def search_grants(
+    q: str = Query(..., min_length=1, description="free-text query over title and description"),
+    limit: int = Query(20, ge=1, le=100),
+    target_group: List[str] = Query([]),
+    location_eligible: List[str] = Query([]),
+    sectors: List[str] = Query([]),
+    eligibility_criteria: List[str] = Query([]),
+):
+    """BM25-ranked grants; each filter keeps grants carrying any of its values"""
+    snapshot = grant_search.snapshot()
+    filters = {
+        "target_group": target_group,
+        "location_eligible": location_eligible,
+        "sectors": sectors,
+        "eligibility_criteria": eligibility_criteria,
+    }
+    hits = grant_search.index.search(q, limit, filters)
+    rows = grant_rows(snapshot)
+    return ORJSONResponse({
+        # the index may already be ahead of this snapshot; skip what it lacks
+        "grants": [{**snapshot.grants[rows[grant_id]], "score": score} for score, grant_id in hits if grant_id in rows],
+    })
+
+@router.get("/grants/{grant_id}", response_class=ORJSONResponse)
+def get_grant(grant_id: str):
+    """One full grants row, including its description"""
+    snapshot = grant_catalog.snapshot()
+    row_id = grant_rows(snapshot).get(grant_id)
+    if row_id is None:
+        raise HTTPException(status_code=404, detail="Grant not found")
+    return ORJSONResponse(dict(snapshot.grants[row_id]))
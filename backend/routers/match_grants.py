@@ -1,20 +1,65 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List
-from supabase import create_client
-from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
 import os
 
-from ..services.score_grant import score_grant
+from ..dependencies import current_user
+from ..responses import ORJSONResponse
+from ..services.bulk_match import match_profiles, profile_to_user, to_ndjson
+from ..services.candidate_query import fetch_candidates, rank_rows, score_rows
+from ..services.grant_catalog import GrantCatalog, fetch_all_rows
+from ..services.match_cache import MatchCache
+from ..services.match_engine import rank_matches, scored_entries
+from ..services.ranking import decode_cursor, iter_ranked
+from ..services.supabase_client import get_supabase
+from ..services.user_matches import MatchRecomputer, RecomputeWorker, UserMatchStore
 
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# where /match-grants finds candidate grants: "catalog" scores the in-memory
+# catalog, "database" asks the match_grant_candidates RPC on every request
+GRANT_CANDIDATES = os.getenv("GRANT_CANDIDATES", "catalog")
 
 router = APIRouter()
 
+def fetch_grants():
+    return fetch_all_rows(get_supabase(), "grants")
+
+def fetch_grants_version():
+    # the exact count is what notices deleted grants
+    res = (
+        get_supabase().table("grants").select("updated_at", count="exact")
+        .order("updated_at", desc=True, nullsfirst=False).limit(1).execute()
+    )
+    return (res.data[0]["updated_at"] if res.data else None), res.count
+
+grant_catalog = GrantCatalog(
+    fetch_grants,
+    fetch_grants_version,
+    ttl=float(os.getenv("GRANT_CATALOG_TTL", "60")),
+    # GRANT_CATALOG_COMPACT=0 keeps the rows as plain dicts
+    compact=os.getenv("GRANT_CATALOG_COMPACT", "1") != "0",
+)
+
+# per-profile first pages (match_engine.CACHE_DEPTH matches per entry);
+# MATCH_CACHE_TTL=0 keeps entries until evicted
+match_ttl = float(os.getenv("MATCH_CACHE_TTL", "300"))
+match_cache = MatchCache(
+    max_size=int(os.getenv("MATCH_CACHE_SIZE", "1024")),
+    ttl=match_ttl or None,
+)
+
+def load_profiles():
+    return [(row["id"], profile_to_user(row)) for row in fetch_all_rows(get_supabase(), "profiles")]
+
+# materialized top matches for stored profiles, served by GET /me/matches;
+# the worker is started at app startup and runs the first build
+user_matches = UserMatchStore(int(os.getenv("USER_MATCHES_LIMIT", "100")))
+match_recomputer = MatchRecomputer(user_matches, grant_catalog, load_profiles)
+recompute_worker = RecomputeWorker(
+    match_recomputer,
+    interval=float(os.getenv("USER_MATCHES_SYNC_INTERVAL", "30")),
+)
+
 class UserProfile(BaseModel):
     user_type: str
     location: str
@@ -22,13 +67,141 @@ class UserProfile(BaseModel):
     race: str
     interests: List[str]
 
-@router.post("/match-grants")
-def match_grants(user: UserProfile):
-    grants = supabase.table("grants").select("*").execute().data
-    scored = []
-    for grant in grants:
-        score = score_grant(user.dict(), grant)
-        if score > 0:
-            grant["score"] = score
-            scored.append(grant)
-    return sorted(scored, key=lambda g: g["score"], reverse=True)
\ No newline at end of file
+# columns of a grants row that a match can return
+GRANT_FIELDS = (
+    "id", "title", "description", "amount", "deadline", "location_eligible", "target_group",
+    "sectors", "eligibility_criteria", "source_url", "created_at", "updated_at",
+)
+# what the match list shows; full descriptions come from GET /grants/{id}
+DEFAULT_MATCH_FIELDS = (
+    "id", "title", "amount", "deadline", "location_eligible", "target_group",
+    "sectors", "eligibility_criteria", "source_url",
+)
+
+class MatchedGrant(BaseModel):
+    """A grants row projected to the requested fields, plus its score"""
+    id: Union[str, int]
+    score: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    amount: Optional[str] = None
+    deadline: Optional[str] = None
+    location_eligible: Optional[List[str]] = None
+    target_group: Optional[List[str]] = None
+    sectors: Optional[List[str]] = None
+    eligibility_criteria: Optional[List[str]] = None
+    source_url: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class MatchGrantsResponse(BaseModel):
+    grants: List[MatchedGrant]
+    next_cursor: Optional[str] = None
+
+def parse_fields(fields):
+    """Columns named by a ?fields= value; raises ValueError for unknown ones."""
+    if fields is None:
+        return DEFAULT_MATCH_FIELDS
+    if fields.strip() == "*":
+        return GRANT_FIELDS
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in GRANT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ("id", *(name for name in names if name != "id"))
+
+def project(row, fields, score):
+    # only the requested columns are read, so a compact row never
+    # decompresses a description the response does not include
+    return {**{field: row[field] for field in fields if field in row}, "score": score}
+
+NDJSON = "application/x-ndjson"
+
+def wants_ndjson(accept):
+    return NDJSON in (accept or "")
+
+class BulkMatchRequest(BaseModel):
+    profiles: Dict[str, UserProfile]  # keyed by the caller's profile id
+    limit: int = Field(20, ge=1, le=100)
+
+@router.post(
+    "/match-grants",
+    response_model=MatchGrantsResponse,
+    response_model_exclude_unset=True,
+    response_class=ORJSONResponse,
+)
+def match_grants(
+    user: UserProfile,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_expired: bool = Query(True, description="also return grants whose deadline has passed"),
+    similarity: bool = Query(False, description="add TF-IDF description similarity to the score"),
+    fields: Optional[str] = Query(
+        None, description="comma-separated grant columns to return, or * for all; defaults to the list view's"
+    ),
+    accept: Optional[str] = Header(None),
+):
+    """Ranked grant matches for a profile, one page at a time.
+
+    With `Accept: application/x-ndjson` every match after `cursor` is
+    streamed instead, one grant per line in rank order, and `limit` is
+    ignored.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        columns = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # similarity needs every description, so it always uses the catalog
+    if GRANT_CANDIDATES == "database" and not similarity:
+        rows = fetch_candidates(get_supabase(), user.dict(), include_expired=include_expired)
+        if wants_ndjson(accept):
+            ranked = iter_ranked(score_rows(rows, user.dict()), after)
+            results = (project(row, columns, score) for score, _, row in ranked)
+            return StreamingResponse(to_ndjson(results), media_type=NDJSON)
+        page, next_cursor = rank_rows(rows, user.dict(), limit, after)
+        return ORJSONResponse({
+            "grants": [project(row, columns, score) for score, _, row in page],
+            "next_cursor": next_cursor,
+        })
+
+    snapshot = grant_catalog.snapshot()
+    if wants_ndjson(accept):
+        entries = scored_entries(
+            snapshot, user.dict(), cache=match_cache, include_expired=include_expired, similarity=similarity,
+        )
+        ranked = iter_ranked(entries, after)
+        # lines are encoded one at a time as the response is sent
+        results = (project(snapshot.grants[row_id], columns, score) for score, _, row_id in ranked)
+        return StreamingResponse(to_ndjson(results), media_type=NDJSON)
+    page, next_cursor = rank_matches(
+        snapshot, user.dict(), limit, after,
+        cache=match_cache, include_expired=include_expired, similarity=similarity,
+    )
+    # returned as a response so the rows are encoded once, by orjson, rather
+    # than validated against MatchGrantsResponse and copied by jsonable_encoder
+    return ORJSONResponse({
+        "grants": [project(snapshot.grants[row_id], columns, score) for score, _, row_id in page],
+        "next_cursor": next_cursor,
+    })
+
+@router.get("/match-grants/cache-stats")
+def match_cache_stats():
+    """Hit, miss and eviction counters of the per-profile match cache"""
+    return match_cache.stats()
+
+@router.post("/match-grants/bulk", dependencies=[Depends(current_user)])
+def match_grants_bulk(request: BulkMatchRequest):
+    """Top matches for many profiles against one catalog snapshot, one
+    NDJSON line per profile: {"profile_id", "grants": [{"id", "title", "score"}]}"""
+    snapshot = grant_catalog.snapshot()
+    profiles = [(profile_id, profile.dict()) for profile_id, profile in request.profiles.items()]
+    # scored in-process against the cached catalog index: a worker pool
+    # per request would pickle the whole catalog to every worker. Large
+    # batches belong to the bulk_match CLI, which can use processes.
+    results = match_profiles(snapshot, profiles, request.limit)
+    return StreamingResponse(to_ndjson(results), media_type=NDJSON)
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Body, Security
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from supabase import create_client
+from fastapi import APIRouter, Depends, HTTPException, Header, Body, Query
+from fastapi.responses import StreamingResponse
 import os
-from dotenv import load_dotenv
 from pydantic import BaseModel
+from typing import Optional
 
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
-router = APIRouter()
+from .match_grants import NDJSON, grant_catalog, match_cache, match_recomputer, user_matches, wants_ndjson
+from ..dependencies import current_user
+from ..responses import ORJSONResponse
+from ..services.bulk_match import profile_to_user, to_ndjson
+from ..services.match_engine import rank_matches, scored_entries
+from ..services.ranking import decode_cursor, iter_ranked
+from ..services.grant_catalog import grant_rows
+from ..services.supabase_client import get_supabase
 
-security = HTTPBearer()
+router = APIRouter()
 
 class UserProfile(BaseModel):
     user_id: str
@@ -21,23 +25,6 @@ class UserProfile(BaseModel):
 class CreateProfileRequest(BaseModel):
     full_name: str
 
-def get_user_from_token(token: str):
-    try:
-        # Remove 'Bearer ' prefix if present
-        if token.startswith('Bearer '):
-            token = token[7:]
-        
-        # Get user from Supabase
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response or not user_response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        return user_response.user
-    except Exception as e:
-        print(f"Token validation error: {str(e)}")
-        raise HTTPException(status_code=401, detail="Invalid or missing token")
-    
 @router.get("/test-auth")
 def test_auth():
     """Test endpoint to verify Supabase connection"""
@@ -78,7 +65,7 @@ def health_check():
     }
 
 @router.get("/debug-token")
-def debug_token(authorization: str = Header(None)):
+def debug_token(authorization: str = Header(None), supabase=Depends(get_supabase)):
     """Debug endpoint to test token parsing"""
     if not authorization:
         return {"error": "No authorization header provided"}
@@ -117,13 +104,9 @@ def debug_token(authorization: str = Header(None)):
             "error": str(e)
         }
 
-@router.get("/me")
-def get_profile(credentials: HTTPAuthorizationCredentials = Security(security)):
+@router.get("/me", response_class=ORJSONResponse)
+def get_profile(user=Depends(current_user), supabase=Depends(get_supabase)):
     try:
-        token = credentials.credentials
-        print(f"Received token: {token[:20]}...")  # Debug: print first 20 chars
-        
-        user = get_user_from_token(token)
         user_id = user.id  # Access the id attribute directly
         
         print(f"User ID: {user_id}")  # Debug: print user ID
@@ -132,7 +115,7 @@ def get_profile(credentials: HTTPAuthorizationCredentials = Security(security)):
         res = supabase.table("profiles").select("*").eq("id", user_id).limit(1).execute()
 
         if res.data and len(res.data) > 0:
-            return res.data[0]  # Return the first (and only) profile
+            return ORJSONResponse(res.data[0])  # Return the first (and only) profile
         else:
             # Return empty profile if not found
             return {
@@ -145,7 +128,7 @@ def get_profile(credentials: HTTPAuthorizationCredentials = Security(security)):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/me-test")
-def get_profile_test():
+def get_profile_test(supabase=Depends(get_supabase)):
     """Temporary test endpoint without authentication"""
     try:
         # Test if we can query the profiles table
@@ -160,11 +143,11 @@ def get_profile_test():
         return {"error": f"Database test failed: {str(e)}"}
 
 @router.post("/create-profile")
-def create_profile(authorization: str = Header(...), request: CreateProfileRequest = Body(...)):
+def create_profile(
+    request: CreateProfileRequest = Body(...), user=Depends(current_user), supabase=Depends(get_supabase)
+):
     """Create a new profile for the authenticated user"""
     try:
-        token = authorization.split("Bearer ")[-1]
-        user = get_user_from_token(token)
         user_id = user.id
         
         # Create profile
@@ -184,9 +167,7 @@ def create_profile(authorization: str = Header(...), request: CreateProfileReque
         raise HTTPException(status_code=500, detail=f"Failed to create profile: {str(e)}")
     
 @router.post("/profile/update")
-def update_profile(full_name: str = Body(...), authorization: str = Header(...)):
-    token = authorization.split("Bearer ")[-1]
-    user = get_user_from_token(token)
+def update_profile(full_name: str = Body(...), user=Depends(current_user), supabase=Depends(get_supabase)):
     user_id = user.id  # Use .id attribute consistently
 
     res = supabase.table("profiles").upsert({
@@ -197,9 +178,7 @@ def update_profile(full_name: str = Body(...), authorization: str = Header(...))
     return {"message": "Profile updated", "profile": res.data}
 
 @router.post("/profile")
-def save_profile(profile: UserProfile, authorization: str = Header(...)):
-    token = authorization.split("Bearer ")[-1]
-    user = get_user_from_token(token)
+def save_profile(profile: UserProfile, user=Depends(current_user), supabase=Depends(get_supabase)):
     user_id = user.id  # Use .id attribute consistently
 
     # enforce that only the current user can write their own profile
@@ -207,4 +186,64 @@ def save_profile(profile: UserProfile, authorization: str = Header(...)):
         raise HTTPException(status_code=403, detail="Cannot modify another user's profile")
 
     response = supabase.table("profiles").upsert(profile.dict()).execute()
+    match_recomputer.profile_changed(user_id, profile_to_user(profile.dict()))
     return {"status": "success", "data": response.data}
+
+# until the first build finishes, for users the store has not seen yet, and
+# for pages past the matches it keeps, /me/matches scores the user's stored
+# profile on the fly
+
+def stored_user(user_id):
+    """The scoring fields of a user's stored profile, or None without one."""
+    res = get_supabase().table("profiles").select("*").eq("id", user_id).execute()
+    return profile_to_user(res.data[0]) if res.data else None
+
+def live_page(snapshot, user_id, limit, after):
+    profile = stored_user(user_id)
+    if profile is None:
+        return [], None
+    page, next_cursor = rank_matches(snapshot, profile, limit, after, cache=match_cache)
+    return [(score, grant_id) for score, grant_id, _ in page], next_cursor
+
+def live_ranked(snapshot, user_id, after):
+    profile = stored_user(user_id)
+    if profile is None:
+        return iter(())
+    entries = scored_entries(snapshot, profile, cache=match_cache)
+    return ((score, grant_id) for score, grant_id, _ in iter_ranked(entries, after))
+
+@router.get("/me/matches", response_class=ORJSONResponse)
+def get_my_matches(
+    user=Depends(current_user),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    accept: Optional[str] = Header(None),
+):
+    """Ranked read of the current user's materialized grant matches.
+
+    With `Accept: application/x-ndjson` every match after `cursor` is
+    streamed, one grant per line.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    snapshot = grant_catalog.snapshot()
+    rows = grant_rows(snapshot)
+    if wants_ndjson(accept):
+        ranked = user_matches.ranked(user.id, after) if match_recomputer.ready else None
+        if ranked is None:
+            ranked = live_ranked(snapshot, user.id, after)
+        results = ({**snapshot.grants[rows[grant_id]], "score": score} for score, grant_id in ranked if grant_id in rows)
+        return StreamingResponse(to_ndjson(results), media_type=NDJSON)
+    result = user_matches.page(user.id, limit, after) if match_recomputer.ready else None
+    if result is None:
+        result = live_page(snapshot, user.id, limit, after)
+    page, next_cursor = result
+    return ORJSONResponse({
+        # grants deleted since the last sync are skipped
+        "grants": [{**snapshot.grants[rows[grant_id]], "score": score} for score, grant_id in page if grant_id in rows],
+        "next_cursor": next_cursor,
+    })
+
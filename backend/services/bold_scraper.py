@@ -1,17 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
-from supabase import create_client, Client
-from dateutil import parser as dateparser
-import os
 import time
 import re
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+from supabase_client import get_supabase
 
 BASE_URL = "https://bold.org"
 BROWSE_URL = f"{BASE_URL}/scholarships/"
@@ -30,6 +19,7 @@ def parse_deadline(text):
     match = re.search(r"(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}", text)
     if match:
         try:
+            from dateutil import parser as dateparser
             return dateparser.parse(match.group(0)).date().isoformat()
         except:
             return None
@@ -460,6 +450,10 @@ def infer_demographic_tags(text):
 # ---------- Scraper ----------
 
 def scrape_bold_page(page=1):
+    # HTTP and HTML parsing are only needed when actually scraping
+    import requests
+    from bs4 import BeautifulSoup
+
     print(f"🔍 Scraping page {page}...")
     scholarships = []
 
@@ -562,6 +556,7 @@ def scrape_bold_page(page=1):
 # ---------- Supabase Upload ----------
 
 def upload_to_supabase(data):
+    supabase = get_supabase()
     for item in data:
         if not item["title"] or item["title"].lower().startswith("access exclusive"):
             continue
@@ -585,6 +580,9 @@ def upload_to_supabase(data):
 # ---------- Run Script ----------
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
     all_data = []
     for i in range(1, 3):  # Change to more pages if needed
         all_data.extend(scrape_bold_page(i))
@@ -0,0 +1,149 @@
+"""Match many profiles against one grant catalog snapshot.
+
+Run as a script to write NDJSON matches for stored profiles, e.g. for
+digest emails or cache warming:
+
+    python -m backend.services.bulk_match --all > matches.ndjson
+    python -m backend.services.bulk_match --profile-id <id> --profile-id <id>
+
+For very large catalogs, --shard-grants maps the encoded catalog into
+every worker once and splits the grants, rather than the profiles,
+between workers.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
+
+from .grant_catalog import CatalogSnapshot, catalog_version, fetch_all_rows
+from .match_engine import rank_matches
+from .shared_catalog import SharedCatalog, top_matches_sharded
+
+# profiles sent to a worker per task, to keep inter-process traffic low
+CHUNK_SIZE = 64
+
+# set in each pool worker by _init_worker
+_worker_snapshot = None
+
+
+def profile_to_user(profile):
+    """Map a `profiles` row onto the fields score_grant reads."""
+    return {
+        "user_type": profile.get("user_type") or "students",
+        "location": profile.get("location") or profile.get("state") or "",
+        "major": profile.get("major") or "",
+        "race": profile.get("race") or "",
+        "interests": profile.get("interests") or [],
+    }
+
+
+def match_result(snapshot, profile_id, user, limit):
+    page, _ = rank_matches(snapshot, user, limit)
+    return {
+        "profile_id": profile_id,
+        "grants": [
+            {"id": grant_id, "title": snapshot.grants[row_id].get("title"), "score": score}
+            for score, grant_id, row_id in page
+        ],
+    }
+
+
+def _init_worker(grants, version):
+    global _worker_snapshot
+    _worker_snapshot = CatalogSnapshot(grants, version, time.time())
+
+
+def _match_chunk(chunk, limit):
+    return [match_result(_worker_snapshot, profile_id, user, limit) for profile_id, user in chunk]
+
+
+def match_profiles(snapshot, profiles, limit=20, workers=1):
+    """Yield a match result for each (profile_id, user) pair, in input order.
+
+    With more than one worker the snapshot is handed to each pool process
+    once, and every worker builds its own index from it.
+    """
+    profiles = list(profiles)
+    chunks = [profiles[i:i + CHUNK_SIZE] for i in range(0, len(profiles), CHUNK_SIZE)]
+    workers = min(workers, len(chunks))
+    if workers <= 1:
+        for profile_id, user in profiles:
+            yield match_result(snapshot, profile_id, user, limit)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(snapshot.grants, snapshot.version)) as pool:
+        for results in pool.map(_match_chunk, chunks, [limit] * len(chunks)):
+            yield from results
+
+
+def match_profiles_sharded(snapshot, profiles, limit=20, workers=1):
+    """Like match_profiles, but every worker scores a shard of the grants.
+
+    The catalog is encoded once into a memory-mapped file that workers
+    attach to, so memory does not grow with the number of workers.
+    """
+    profiles = list(profiles)
+    with SharedCatalog.create(snapshot.grants) as shared:
+        ranked = top_matches_sharded(shared, [user for _, user in profiles], limit, workers)
+        for (profile_id, _), top in zip(profiles, ranked):
+            yield {
+                "profile_id": profile_id,
+                "grants": [
+                    {
+                        "id": str(snapshot.grants[row_id]["id"]),
+                        "title": snapshot.grants[row_id].get("title"),
+                        "score": score,
+                    }
+                    for score, _, row_id in top
+                ],
+            }
+
+
+def to_ndjson(results):
+    for result in results:
+        yield orjson.dumps(result).decode() + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match stored profiles against the grants table as NDJSON.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--all", action="store_true", help="match every row in profiles")
+    target.add_argument("--profile-id", action="append", help="profile id to match (repeatable)")
+    parser.add_argument("--limit", type=int, default=20, help="matches per profile")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--output", help="write here instead of stdout")
+    parser.add_argument("--shard-grants", action="store_true", help="split grants, not profiles, across workers")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    # imported after .env is loaded, so its SUPABASE_* pool settings apply
+    from .supabase_client import supabase_factory
+
+    supabase = supabase_factory.client()
+    try:
+        grants = fetch_all_rows(supabase, "grants")
+        snapshot = CatalogSnapshot(grants, catalog_version(grants), time.time())
+        if args.all:
+            rows = fetch_all_rows(supabase, "profiles")
+        else:
+            rows = supabase.table("profiles").select("*").in_("id", args.profile_id).execute().data
+    finally:
+        supabase_factory.close()
+    profiles = [(row["id"], profile_to_user(row)) for row in rows]
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        match = match_profiles_sharded if args.shard_grants else match_profiles
+        for line in to_ndjson(match(snapshot, profiles, args.limit, args.workers)):
+            out.write(line)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Score candidate grants selected by Postgres instead of the in-memory catalog.
+
+The match_grant_candidates RPC (supabase/migrations) uses the GIN indexes
+on the array columns and a trigram index on the description to return
+only grants that can score more than the open-deadline bonus. They are
+scored here exactly as the catalog path scores them.
+"""
+from datetime import date
+
+from .grant_catalog import PAGE_SIZE, fetch_pages
+from .grant_index import candidate_terms
+from .normalized_grant import normalize_grant, prepare_user
+from .ranking import paginate
+from .score_grant import normalized_scorer, score_normalized_grant
+from .scoring_rules import RULES
+
+
+def candidate_params(user, today=None, include_expired=True, rules=RULES):
+    """Arguments of the match_grant_candidates RPC for a user dict.
+
+    A tag or interest only a zero-weight rule looks at is sent as NULL or
+    an empty list, which turns its branch of the RPC off.
+    """
+    query = prepare_user(user)
+    terms, searches_description = candidate_terms(query, rules)
+    return {
+        "p_user_type": query.user_type if "target_group" in terms else None,
+        "p_location": query.location if "location_eligible" in terms else None,
+        "p_sector_terms": sorted(terms.get("sectors", ())),
+        "p_race": query.race if "eligibility_criteria" in terms else None,
+        "p_interests": list(query.interests) if searches_description else [],
+        "p_include_expired": include_expired,
+        "p_today": (today or date.today()).isoformat(),
+    }
+
+
+def fetch_candidates(supabase, user, today=None, include_expired=True, page_size=PAGE_SIZE, rules=RULES):
+    """Every candidate grant row for a user, in id order."""
+    params = candidate_params(user, today, include_expired, rules)
+    return fetch_pages(lambda: supabase.rpc("match_grant_candidates", params), page_size)
+
+
+def score_rows(rows, user, today=None, rules=None):
+    """(score, grant_id, row) for every candidate row that scores."""
+    today = today or date.today()
+    query = prepare_user(user)
+    scorer = score_normalized_grant if rules is None else normalized_scorer(tuple(rules))
+    entries = []
+    for row in rows:
+        score = scorer(query, normalize_grant(row), today)
+        if score > 0:
+            entries.append((score, str(row["id"]), row))
+    return entries
+
+
+def rank_rows(rows, user, limit, after=None, today=None, rules=None):
+    """One page of (score, grant_id, row) for candidate rows, plus the next cursor."""
+    return paginate(score_rows(rows, user, today, rules), limit, after)
@@ -0,0 +1,133 @@
+"""Compact in-memory grant rows.
+
+A row decoded from Supabase is a dict holding its own copy of every tag
+string and the whole description. CompactGrant keeps the scalar columns
+in a slotted record, replaces tag strings with ids from a vocabulary
+shared by every row, and keeps the description compressed until a
+caller reads it. It is a read-only Mapping, so code written against
+grant dicts (`grant["id"]`, `grant.get("sectors")`, `{**grant}`) keeps
+working unchanged.
+"""
+import sys
+import threading
+import zlib
+from collections.abc import Mapping
+
+TAG_COLUMNS = ("target_group", "location_eligible", "sectors", "eligibility_criteria")
+SCALAR_COLUMNS = ("id", "title", "amount", "deadline", "source_url", "created_at", "updated_at")
+
+
+class TagVocabulary:
+    """Interns tag strings into small integer ids, and tuples of ids."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self.tags = []
+        self._tuples = {(): ()}
+
+    def __len__(self):
+        return len(self.tags)
+
+    def encode(self, tags):
+        """Shared tuple of ids for a tag list, or None for a NULL column."""
+        if tags is None:
+            return None
+        with self._lock:
+            ids = []
+            for tag in tags:
+                tag_id = self._ids.get(tag)
+                if tag_id is None:
+                    tag_id = self._ids[tag] = len(self.tags)
+                    self.tags.append(sys.intern(tag))
+                ids.append(tag_id)
+            ids = tuple(ids)
+            # rows mostly repeat a few tag combinations, so share the tuples too
+            return self._tuples.setdefault(ids, ids)
+
+    def decode(self, ids):
+        if ids is None:
+            return None
+        return [self.tags[i] for i in ids]
+
+
+# one vocabulary for every column and snapshot, so ids stay stable across reloads
+TAGS = TagVocabulary()
+
+
+class CompactGrant(Mapping):
+    """One grants row; columns are read back as the dict row would hold them."""
+
+    __slots__ = ("_scalars", "_tags", "_description", "_extra")
+
+    def __init__(self, row):
+        self._scalars = tuple(row.get(column, _MISSING) for column in SCALAR_COLUMNS)
+        self._tags = tuple(TAGS.encode(row[column]) if column in row else _MISSING for column in TAG_COLUMNS)
+        description = row.get("description", _MISSING)
+        if isinstance(description, str):
+            description = zlib.compress(description.encode("utf-8"))
+        self._description = description
+        extra = {k: v for k, v in row.items() if k not in _KNOWN_COLUMNS}
+        self._extra = extra or None
+
+    def __getitem__(self, key):
+        if key in _SCALAR_INDEX:
+            value = self._scalars[_SCALAR_INDEX[key]]
+        elif key in _TAG_INDEX:
+            value = self._tags[_TAG_INDEX[key]]
+            if value is not _MISSING:
+                value = TAGS.decode(value)
+        elif key == "description":
+            value = self._description
+            if isinstance(value, bytes):
+                value = zlib.decompress(value).decode("utf-8")
+        else:
+            value = (self._extra or {}).get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        # Mapping's default reads the value, which decompresses a description
+        if key in _SCALAR_INDEX:
+            return self._scalars[_SCALAR_INDEX[key]] is not _MISSING
+        if key in _TAG_INDEX:
+            return self._tags[_TAG_INDEX[key]] is not _MISSING
+        if key == "description":
+            return self._description is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def _keys(self):
+        for column, value in zip(SCALAR_COLUMNS, self._scalars):
+            if value is not _MISSING:
+                yield column
+        for column, value in zip(TAG_COLUMNS, self._tags):
+            if value is not _MISSING:
+                yield column
+        if self._description is not _MISSING:
+            yield "description"
+        yield from self._extra or ()
+
+    def __iter__(self):
+        return self._keys()
+
+    def __len__(self):
+        return sum(1 for _ in self._keys())
+
+    def __reduce__(self):
+        # tag ids are only meaningful in this process's vocabulary
+        return CompactGrant, (dict(self),)
+
+    def __repr__(self):
+        return f"CompactGrant({dict(self)!r})"
+
+
+# marks a column the source row did not have
+_MISSING = object()
+_SCALAR_INDEX = {column: i for i, column in enumerate(SCALAR_COLUMNS)}
+_TAG_INDEX = {column: i for i, column in enumerate(TAG_COLUMNS)}
+_KNOWN_COLUMNS = set(SCALAR_COLUMNS) | set(TAG_COLUMNS) | {"description"}
+
+
+def compact_grants(rows):
+    return [CompactGrant(row) for row in rows]
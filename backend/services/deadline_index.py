@@ -0,0 +1,29 @@
+from bisect import bisect_left
+
+from .normalized_grant import normalize_snapshot
+
+
+class DeadlineIndex:
+    """Grant rows sorted by the last day they are open.
+
+    One bisect per request gives the cutoff position; a row is open when
+    its position is at or after the cutoff.
+    """
+
+    def __init__(self, grants):
+        rows = sorted(range(len(grants)), key=lambda row_id: grants[row_id].open_until)
+        self.ordinals = [grants[row_id].open_until.toordinal() for row_id in rows]
+        self.positions = [0] * len(grants)
+        for position, row_id in enumerate(rows):
+            self.positions[row_id] = position
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot.derived("normalized_grants", normalize_snapshot))
+
+    def cutoff(self, today):
+        """Position of the first row still open on `today`."""
+        return bisect_left(self.ordinals, today.toordinal())
+
+    def is_open(self, row_id, cutoff):
+        return self.positions[row_id] >= cutoff
@@ -1,8 +1,9 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
 import re
 
 def debug_scholarship_page():
+    from playwright.sync_api import sync_playwright
+    from bs4 import BeautifulSoup
+
     url = "https://www.unigo.com/scholarships/our-scholarships/i-have-a-dream-scholarship"
     
     with sync_playwright() as p:
@@ -0,0 +1,94 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+from .normalized_grant import TOKEN_RE
+
+# joins the vocabulary into one searchable string; never part of a token
+WORD_SEPARATOR = "\n"
+# bound on remembered token -> rows lookups per index
+MAX_CACHED_TOKENS = 10_000
+
+
+class DescriptionIndex:
+    """Finds grants whose lowercased description contains an interest.
+
+    Same answer as `interest in description` for every row, but resolved
+    through a word -> row ids index instead of scanning each description.
+    An interest can only occur in a description if each of its word runs
+    occurs inside some word of that description, so the index narrows the
+    rows and a substring check on the survivors keeps the result exact.
+    """
+
+    def __init__(self, grants):
+        # descriptions are read back from the grants only to check survivors
+        self.grants = grants
+        postings = defaultdict(list)
+        for row_id, grant in enumerate(grants):
+            # tokens are only kept as postings keys, one string per word
+            for token in set(TOKEN_RE.findall(grant.description)):
+                postings[token].append(row_id)
+        self.words = list(postings)
+        self.postings = [postings[word] for word in self.words]
+        self.vocabulary = WORD_SEPARATOR.join(self.words)
+        self.word_starts = []
+        offset = 0
+        for word in self.words:
+            self.word_starts.append(offset)
+            offset += len(word) + len(WORD_SEPARATOR)
+        self._containing = {}
+        self._mentioning = {}
+
+    def rows_with_word_containing(self, token):
+        """Row ids whose description has a word with `token` inside it."""
+        rows = self._containing.get(token)
+        if rows is not None:
+            return rows
+        rows = set()
+        pos = self.vocabulary.find(token)
+        while pos != -1:
+            word_id = bisect_right(self.word_starts, pos) - 1
+            rows.update(self.postings[word_id])
+            if word_id + 1 == len(self.words):
+                break
+            pos = self.vocabulary.find(token, self.word_starts[word_id + 1])
+        if len(self._containing) >= MAX_CACHED_TOKENS:
+            self._containing.clear()
+        self._containing[token] = rows
+        return rows
+
+    def rows_mentioning(self, interest):
+        """Row ids whose description contains the lowercased `interest`."""
+        tokens = set(TOKEN_RE.findall(interest))
+        if not tokens:
+            if not interest:
+                return set(range(len(self.grants)))
+            # nothing to look up (e.g. "++"): fall back to a scan
+            return {row_id for row_id, grant in enumerate(self.grants) if interest in grant.description}
+        if tokens == {interest}:
+            return self._rows_containing_all(tokens)
+        rows = self._mentioning.get(interest)
+        if rows is None:
+            survivors = self._rows_containing_all(tokens)
+            rows = {row_id for row_id in survivors if interest in self.grants[row_id].description}
+            if len(self._mentioning) >= MAX_CACHED_TOKENS:
+                self._mentioning.clear()
+            self._mentioning[interest] = rows
+        return rows
+
+    def _rows_containing_all(self, tokens):
+        """Row ids with a word containing each of `tokens`."""
+        rows = None
+        # longer tokens tend to be rarer, so they shrink the set fastest
+        for token in sorted(tokens, key=len, reverse=True):
+            found = self.rows_with_word_containing(token)
+            rows = set(found) if rows is None else rows & found
+            if not rows:
+                break
+        return rows
+
+    def mentions(self, interests):
+        """Row ids whose description contains any of the lowercased `interests`."""
+        rows = set()
+        for interest in interests:
+            rows |= self.rows_mentioning(interest)
+        return rows
@@ -0,0 +1,134 @@
+import threading
+import time
+
+from .compact_grant import compact_grants
+
+# PostgREST caps a single response (1000 rows by default), so page through it
+PAGE_SIZE = 1000
+
+
+class CatalogSnapshot:
+    """The grants table as loaded at one version. Treat as read-only."""
+
+    def __init__(self, grants, version, loaded_at):
+        self.grants = grants
+        self.version = version
+        self.loaded_at = loaded_at
+        self._derived = {}
+        # reentrant: a derived structure may be built from another one
+        self._lock = threading.RLock()
+
+    def derived(self, name, build):
+        """Return `build(self)`, computed once per snapshot and shared after that."""
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self)
+            return self._derived[name]
+
+
+def fetch_pages(make_query, page_size=PAGE_SIZE):
+    """Every row a PostgREST query returns, fetched in id order one page at a time.
+
+    `make_query` builds a fresh query (a table select or an rpc call) per page.
+    """
+    rows = []
+    while True:
+        start = len(rows)
+        page = make_query().order("id").range(start, start + page_size - 1).execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
+def fetch_all_rows(supabase, table, columns="*", page_size=PAGE_SIZE):
+    """Every row of `table`, fetched in id order one page at a time."""
+    return fetch_pages(lambda: supabase.table(table).select(columns), page_size)
+
+
+def catalog_version(grants):
+    """Version of a set of grant rows: (newest updated_at, row count).
+
+    The count is part of it because deleting a grant never moves max(updated_at).
+    """
+    return max((g["updated_at"] for g in grants if g.get("updated_at")), default=None), len(grants)
+
+
+def grant_ids(snapshot):
+    """Grant ids as strings, aligned with `snapshot.grants` by row id."""
+    return snapshot.derived("grant_ids", lambda s: [str(g["id"]) for g in s.grants])
+
+
+def grant_rows(snapshot):
+    """grant id -> row id for a catalog snapshot."""
+    return snapshot.derived("grant_rows", lambda s: {grant_id: i for i, grant_id in enumerate(grant_ids(s))})
+
+
+def diff_snapshots(old, new):
+    """Compare two snapshots by grant id and updated_at.
+
+    Returns (changed, removed): row ids in `new` of grants that are new or
+    whose updated_at moved, and ids of grants that are gone from `new`.
+    """
+    previous = {str(g["id"]): g.get("updated_at") for g in old.grants}
+    changed = []
+    current = set()
+    for row_id, grant in enumerate(new.grants):
+        grant_id = str(grant["id"])
+        current.add(grant_id)
+        if grant_id not in previous or previous[grant_id] != grant.get("updated_at"):
+            changed.append(row_id)
+    return changed, previous.keys() - current
+
+
+class GrantCatalog:
+    """Keeps the grants table in memory and refreshes it when it changes.
+
+    `fetch_grants` returns every grant row. `fetch_version` returns the
+    table's current (max(updated_at), row count), as catalog_version does,
+    and is used after the TTL expires to decide whether a full reload is
+    needed at all: inserts and updates move the first, deletes the second.
+    With `compact` the rows are kept as CompactGrant records instead of
+    dicts.
+    """
+
+    def __init__(self, fetch_grants, fetch_version=None, ttl=60.0, clock=time.monotonic, compact=False):
+        self._fetch_grants = fetch_grants
+        self._fetch_version = fetch_version
+        self.ttl = ttl
+        self.compact = compact
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def _is_fresh(self, now):
+        return self._snapshot is not None and now - self._checked_at < self.ttl
+
+    def snapshot(self):
+        """Return the current snapshot, reloading it if it is stale."""
+        if self._is_fresh(self._clock()):
+            return self._snapshot
+        with self._lock:
+            # another request may have refreshed while we waited for the lock
+            if not self._is_fresh(self._clock()):
+                self._refresh()
+            return self._snapshot
+
+    def grants(self):
+        return self.snapshot().grants
+
+    def invalidate(self):
+        """Drop the cached table so the next request reloads it in full."""
+        with self._lock:
+            self._snapshot = None
+
+    def _refresh(self):
+        if self._snapshot is not None and self._fetch_version is not None:
+            if self._fetch_version() == self._snapshot.version:
+                self._checked_at = self._clock()
+                return
+        grants = self._fetch_grants()
+        if self.compact:
+            grants = compact_grants(grants)
+        self._snapshot = CatalogSnapshot(grants, catalog_version(grants), time.time())
+        self._checked_at = self._clock()
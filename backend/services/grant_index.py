@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+from .description_index import DescriptionIndex
+from .normalized_grant import normalize_snapshot
+from .scoring_rules import NORMALIZED_TERMS, RULES
+
+
+def candidate_terms(query, rules=RULES):
+    """What makes a grant a candidate for a UserQuery under `rules`.
+
+    Returns ({tag column: query terms}, searches_description), taken from
+    the rules with a non-zero weight only: a tag a zero-weight rule looks
+    at earns nothing, so sharing it must not make a grant a candidate.
+    """
+    terms = {}
+    searches_description = False
+    for rule in rules:
+        if not rule.weight:
+            continue
+        if rule.match == "substring":
+            searches_description = True
+        elif rule.match == "contains":
+            value = getattr(query, NORMALIZED_TERMS[(rule.grant, tuple(sorted(rule.user)), rule.casefold)])
+            terms.setdefault(rule.grant, set()).update([value] if isinstance(value, str) else value)
+    return terms, searches_description
+
+
+class EligibilityIndex:
+    """Inverted index over the grant array columns used by score_grant.
+
+    Built from NormalizedGrant rows. Each column maps a tag to the set of
+    row ids (positions in the grant list the index was built from) that
+    carry it; eligibility_criteria tags are already lowercased.
+    """
+
+    def __init__(self, grants):
+        self.target_group = defaultdict(set)
+        self.location_eligible = defaultdict(set)
+        self.sectors = defaultdict(set)
+        self.eligibility_criteria = defaultdict(set)
+        self.descriptions = DescriptionIndex(grants)
+        for row_id, grant in enumerate(grants):
+            for tag in grant.target_group:
+                self.target_group[tag].add(row_id)
+            for tag in grant.location_eligible:
+                self.location_eligible[tag].add(row_id)
+            for tag in grant.sectors:
+                self.sectors[tag].add(row_id)
+            for tag in grant.eligibility_criteria:
+                self.eligibility_criteria[tag].add(row_id)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot.derived("normalized_grants", normalize_snapshot))
+
+    def mentions(self, query):
+        """Row ids whose description mentions one of the query's interests."""
+        return self.descriptions.mentions(query.interests)
+
+    def candidates(self, query, mentions=None, rules=RULES):
+        """Row ids of every grant that shares a tag with the UserQuery or
+        mentions one of its interests in the description, through a rule
+        of `rules` that carries points.
+
+        Pass `mentions` when it was already computed for this query.
+        Grants outside this set can only score the open-deadline bonus.
+        """
+        terms, searches_description = candidate_terms(query, rules)
+        found = set()
+        if searches_description:
+            found |= self.mentions(query) if mentions is None else mentions
+        for column, values in terms.items():
+            postings = getattr(self, column)
+            for value in values:
+                found |= postings.get(value, set())
+        return found
@@ -0,0 +1,191 @@
+import math
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from .grant_catalog import diff_snapshots
+from .normalized_grant import TOKEN_RE
+
+# array columns that can be used as search filters
+FILTER_FIELDS = ("target_group", "location_eligible", "sectors", "eligibility_criteria")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class SearchIndex:
+    """In-memory BM25 index over grant title and description.
+
+    Grants are added, replaced and removed one at a time. Each grant gets
+    an integer slot; a removed grant's slot goes on a free list and is
+    given to the next grant added, so the slot arrays never outgrow the
+    largest number of grants indexed at once.
+    Per-term posting arrays are cached for queries and dropped when a
+    grant using the term changes.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._slots = {}  # grant id -> slot
+        self._grant_ids = []  # slot -> grant id, None once removed
+        self._lengths = []  # slot -> number of tokens
+        self._terms = []  # slot -> Counter of terms
+        self._tags = []  # slot -> {field: tags}
+        self._free = []  # slots of removed grants, reused by add()
+        self._postings = defaultdict(dict)  # term -> {slot: term frequency}
+        self._filters = {field: defaultdict(set) for field in FILTER_FIELDS}  # field -> tag -> slots
+        self._total_length = 0
+        self._arrays = {}  # term -> (slots, frequencies) as numpy arrays
+        self._filter_arrays = {}  # (field, tag) -> slots as a numpy array
+        self._length_array = None
+
+    def __len__(self):
+        return len(self._slots)
+
+    def add(self, grant):
+        """Index a grant row, replacing any earlier version with the same id."""
+        with self._lock:
+            grant_id = str(grant["id"])
+            self.remove(grant_id)
+            terms = Counter(tokenize(grant.get("title")) + tokenize(grant.get("description")))
+            tags = {field: frozenset(grant.get(field) or ()) for field in FILTER_FIELDS}
+            if self._free:
+                slot = self._free.pop()
+                self._grant_ids[slot] = grant_id
+                self._lengths[slot] = sum(terms.values())
+                self._terms[slot] = terms
+                self._tags[slot] = tags
+            else:
+                slot = len(self._grant_ids)
+                self._grant_ids.append(grant_id)
+                self._lengths.append(sum(terms.values()))
+                self._terms.append(terms)
+                self._tags.append(tags)
+            self._slots[grant_id] = slot
+            for term, frequency in terms.items():
+                self._postings[term][slot] = frequency
+                self._arrays.pop(term, None)
+            for field, values in tags.items():
+                for tag in values:
+                    self._filters[field][tag].add(slot)
+                    self._filter_arrays.pop((field, tag), None)
+            self._total_length += self._lengths[slot]
+            self._length_array = None
+
+    def remove(self, grant_id):
+        with self._lock:
+            slot = self._slots.pop(grant_id, None)
+            if slot is None:
+                return
+            for term in self._terms[slot]:
+                del self._postings[term][slot]
+                if not self._postings[term]:
+                    del self._postings[term]
+                self._arrays.pop(term, None)
+            for field, values in self._tags[slot].items():
+                for tag in values:
+                    self._filters[field][tag].discard(slot)
+                    self._filter_arrays.pop((field, tag), None)
+            self._total_length -= self._lengths[slot]
+            self._grant_ids[slot] = None
+            self._lengths[slot] = 0
+            self._terms[slot] = Counter()
+            self._tags[slot] = {}
+            self._free.append(slot)
+
+    def _term_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings.get(term, {})
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def _filter_slots(self, field, tag):
+        slots = self._filter_arrays.get((field, tag))
+        if slots is None:
+            tagged = self._filters[field].get(tag, set())
+            slots = np.fromiter(tagged, dtype=np.int64, count=len(tagged))
+            self._filter_arrays[(field, tag)] = slots
+        return slots
+
+    def _filter_mask(self, filters):
+        mask = None
+        for field, values in filters.items():
+            if not values:
+                continue
+            field_mask = np.zeros(len(self._grant_ids), dtype=bool)
+            for tag in values:
+                field_mask[self._filter_slots(field, tag)] = True
+            mask = field_mask if mask is None else mask & field_mask
+        return mask
+
+    def search(self, text, limit=20, filters=None):
+        """Best `limit` (score, grant_id) pairs for a free-text query.
+
+        `filters` maps array columns to tag lists; a grant must carry at
+        least one listed tag in every filtered column.
+        """
+        with self._lock:
+            terms = set(tokenize(text))
+            if not terms or not self._slots:
+                return []
+            if self._length_array is None:
+                self._length_array = np.array(self._lengths, dtype=np.float64)
+            count = len(self._slots)
+            average_length = self._total_length / count or 1.0
+            scores = np.zeros(len(self._grant_ids), dtype=np.float64)
+            for term in terms:
+                slots, frequencies = self._term_arrays(term)
+                if not len(slots):
+                    continue
+                idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * self._length_array[slots] / average_length)
+                scores[slots] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+            mask = self._filter_mask(filters or {})
+            if mask is not None:
+                scores[~mask] = 0
+            hits = np.flatnonzero(scores > 0)
+            if len(hits) > limit:
+                hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+            ranked = sorted(((-scores[slot], self._grant_ids[slot]) for slot in hits))
+            return [(float(-negated), grant_id) for negated, grant_id in ranked]
+
+
+class GrantSearch:
+    """A SearchIndex kept in step with a GrantCatalog snapshot by snapshot."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.index = SearchIndex()
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Current catalog snapshot, with the index updated to match it.
+
+        The index only moves forward: a caller holding a snapshot older
+        than the indexed one gets the indexed one instead.
+        """
+        snapshot = self.catalog.snapshot()
+        with self._lock:
+            if self._snapshot is not None and snapshot.loaded_at < self._snapshot.loaded_at:
+                return self._snapshot
+            if snapshot is not self._snapshot:
+                if self._snapshot is None:
+                    changed, removed = range(len(snapshot.grants)), ()
+                else:
+                    changed, removed = diff_snapshots(self._snapshot, snapshot)
+                for grant_id in removed:
+                    self.index.remove(grant_id)
+                for row_id in changed:
+                    self.index.add(snapshot.grants[row_id])
+                self._snapshot = snapshot
+        return snapshot
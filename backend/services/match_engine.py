@@ -0,0 +1,115 @@
+from datetime import date
+
+import numpy as np
+
+from .deadline_index import DeadlineIndex
+from .grant_catalog import grant_ids
+from .grant_index import EligibilityIndex
+from .match_cache import profile_key
+from .normalized_grant import normalize_snapshot, prepare_user
+from .ranking import paginate, top_k
+from .score_grant import normalized_scorer, score_normalized_grant
+from .scoring_rules import RULES
+from .tfidf import TfidfModel
+
+# points for a description identical in wording to the user's interests
+# and major (cosine similarity 1.0) when the similarity signal is on
+SIMILARITY_WEIGHT = 15
+
+# ranked entries a MatchCache keeps per profile: the first pages, not
+# every grant that scores, so an entry stays small however big the catalog
+CACHE_DEPTH = 200
+
+
+def similarity_points(snapshot, query):
+    """Per-row points from TF-IDF similarity of description to the user's
+    interests and major."""
+    model = snapshot.derived("tfidf", TfidfModel.from_snapshot)
+    similarity = model.similarity(" ".join([*query.interests, query.major]))
+    return np.rint(SIMILARITY_WEIGHT * similarity).astype(np.int64)
+
+
+def score_candidates(snapshot, query, today=None, include_expired=True, similarity=False, rules=None):
+    """Yield (score, grant_id, row_id) for every candidate grant that scores.
+
+    With include_expired=False, grants whose deadline has passed are skipped.
+    With similarity=True, TF-IDF similarity adds up to SIMILARITY_WEIGHT
+    points, and grants it gives points to become candidates too. `rules`
+    replaces the active scoring rules, e.g. with tuned weights.
+    """
+    scorer = score_normalized_grant if rules is None else normalized_scorer(tuple(rules))
+    index = snapshot.derived("eligibility_index", EligibilityIndex.from_snapshot)
+    normalized = snapshot.derived("normalized_grants", normalize_snapshot)
+    deadlines = snapshot.derived("deadline_index", DeadlineIndex.from_snapshot)
+    ids = grant_ids(snapshot)
+    today = today or date.today()
+    cutoff = deadlines.cutoff(today)
+    mentions = index.mentions(query)
+    candidates = index.candidates(query, mentions, RULES if rules is None else rules)
+    if similarity:
+        points = similarity_points(snapshot, query)
+        candidates.update(np.flatnonzero(points).tolist())
+    for row_id in candidates:
+        is_open = deadlines.is_open(row_id, cutoff)
+        if not is_open and not include_expired:
+            continue
+        score = scorer(query, normalized[row_id], today, row_id in mentions, is_open)
+        if similarity:
+            score += int(points[row_id])
+        if score > 0:
+            yield score, ids[row_id], row_id
+
+
+def cache_key(user, snapshot, today, include_expired, similarity, rules=None):
+    return profile_key(user, snapshot, today), include_expired, similarity, rules and tuple(rules)
+
+
+def cached_ranking(entries):
+    """(the best CACHE_DEPTH entries in rank order, whether that is all of them)."""
+    top = top_k(entries, CACHE_DEPTH + 1)
+    return top[:CACHE_DEPTH], len(top) <= CACHE_DEPTH
+
+
+def scored_entries(snapshot, user, today=None, cache=None, include_expired=True, similarity=False):
+    """Every (score, grant_id, row_id) a user dict scores, unordered.
+
+    With a MatchCache, a profile whose matches all fit in its cached
+    ranking is served without re-scoring.
+    """
+    today = today or date.today()
+    if cache is None:
+        return list(score_candidates(snapshot, prepare_user(user), today, include_expired, similarity))
+    key = cache_key(user, snapshot, today, include_expired, similarity)
+    cached = cache.get(key)
+    if cached is not None and cached[1]:
+        return cached[0]
+    entries = list(score_candidates(snapshot, prepare_user(user), today, include_expired, similarity))
+    if cached is None:
+        cache.put(key, cached_ranking(entries))
+    return entries
+
+
+def rank_matches(
+    snapshot, user, limit, after=None, today=None, cache=None, include_expired=True, similarity=False, rules=None
+):
+    """One page of (score, grant_id, row_id) for a user dict, plus the next cursor.
+
+    With a MatchCache, pages inside the profile's cached ranking are served
+    from it; a page past its end is scored again. `rules` is passed on to
+    score_candidates.
+    """
+    today = today or date.today()
+    query = prepare_user(user)
+    if cache is not None:
+        key = cache_key(user, snapshot, today, include_expired, similarity, rules)
+        cached = cache.get(key)
+        if cached is None:
+            cached = cached_ranking(score_candidates(snapshot, query, today, include_expired, similarity, rules))
+            cache.put(key, cached)
+        top, complete = cached
+        page, next_cursor = paginate(top, limit, after)
+        # a next cursor means the page and the entry after it were both cached
+        if complete or next_cursor is not None:
+            return page, next_cursor
+    entries = score_candidates(snapshot, query, today, include_expired, similarity, rules)
+    return paginate(entries, limit, after)
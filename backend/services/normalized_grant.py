@@ -0,0 +1,80 @@
+import re
+from collections.abc import Mapping
+from datetime import datetime, date
+from typing import NamedTuple, Optional
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class NormalizedGrant(NamedTuple):
+    """A grant row prepared for scoring: parsed once, read on every request.
+
+    Tag sets keep the case score_grant compares with; eligibility_criteria
+    are lowercased. The description is not copied: `description` reads it
+    from the source row and lowercases it on each access.
+    """
+
+    target_group: frozenset
+    location_eligible: frozenset
+    sectors: frozenset
+    eligibility_criteria: frozenset
+    deadline: Optional[date]
+    # last day the grant counts as open: date.max without a deadline,
+    # date.min when the deadline could not be parsed
+    open_until: date
+    row: Mapping
+
+    @property
+    def description(self):
+        return (self.row.get("description") or "").lower()
+
+
+class UserQuery(NamedTuple):
+    """A user profile prepared once per request for score_normalized_grant."""
+
+    user_type: str
+    location: str
+    major: str
+    sector_terms: frozenset
+    race: str
+    interests: tuple
+
+
+def parse_deadline(raw_deadline):
+    """Return (deadline, open_until) for a raw `deadline` column value."""
+    if not raw_deadline:
+        return None, date.max
+    try:
+        deadline = datetime.strptime(raw_deadline, "%Y-%m-%d").date()
+    except ValueError:
+        return None, date.min
+    return deadline, deadline
+
+
+def normalize_grant(grant):
+    deadline, open_until = parse_deadline(grant.get("deadline"))
+    return NormalizedGrant(
+        target_group=frozenset(grant.get("target_group") or ()),
+        location_eligible=frozenset(grant.get("location_eligible") or ()),
+        sectors=frozenset(grant.get("sectors") or ()),
+        eligibility_criteria=frozenset(t.lower() for t in grant.get("eligibility_criteria") or ()),
+        deadline=deadline,
+        open_until=open_until,
+        row=grant,
+    )
+
+
+def normalize_snapshot(snapshot):
+    """Normalized grants aligned with `snapshot.grants` by row id."""
+    return [normalize_grant(grant) for grant in snapshot.grants]
+
+
+def prepare_user(user):
+    return UserQuery(
+        user_type=user["user_type"],
+        location=user["location"],
+        major=user["major"],
+        sector_terms=frozenset([user["major"], *user["interests"]]),
+        race=user["race"].lower(),
+        interests=tuple(interest.lower() for interest in user["interests"]),
+    )
@@ -0,0 +1,57 @@
+import heapq
+
+
+def rank_key(score, grant_id):
+    """Sort key for ranked results: highest score first, ties by grant id."""
+    return (-score, grant_id)
+
+
+def encode_cursor(score, grant_id):
+    return f"{score}:{grant_id}"
+
+
+def decode_cursor(cursor):
+    """Parse a cursor from encode_cursor; raises ValueError if malformed."""
+    score, sep, grant_id = cursor.partition(":")
+    if not sep or not grant_id:
+        raise ValueError(f"Malformed cursor: {cursor!r}")
+    return int(score), grant_id
+
+
+def top_k(scored, limit, after=None):
+    """Best `limit` (score, grant_id, item) tuples in rank order.
+
+    Only entries ranked strictly after the `after` (score, grant_id) cursor
+    are considered. Uses a bounded heap, so the full list is never sorted.
+    """
+    if after is not None:
+        after_key = rank_key(*after)
+        scored = (entry for entry in scored if rank_key(entry[0], entry[1]) > after_key)
+    return heapq.nsmallest(limit, scored, key=lambda entry: rank_key(entry[0], entry[1]))
+
+
+def iter_ranked(scored, after=None):
+    """Yield entries in rank order, one at a time.
+
+    The entries are heapified once and popped as the caller consumes them,
+    so each result can be sent as soon as it is known to come next.
+    """
+    after_key = rank_key(*after) if after is not None else None
+    heap = []
+    for entry in scored:
+        key = rank_key(entry[0], entry[1])
+        if after_key is None or key > after_key:
+            # grant ids are unique, so entries themselves are never compared
+            heap.append((key, entry))
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[1]
+
+
+def paginate(scored, limit, after=None):
+    """Return one page of entries and the cursor for the next page (or None)."""
+    page = top_k(scored, limit + 1, after)
+    if len(page) <= limit:
+        return page, None
+    last = page[limit - 1]
+    return page[:limit], encode_cursor(last[0], last[1])
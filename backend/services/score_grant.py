@@ -1,4 +1,7 @@
 from datetime import datetime, date
+from functools import lru_cache
+
+from .scoring_rules import RULES, compile_normalized_scorer
 
 def score_grant(user, grant): #user in json, grant in json
     score = 0 
@@ -24,3 +27,21 @@ def score_grant(user, grant): #user in json, grant in json
         score += 15
     return score
 
+
+# compiled from the scoring rules (SCORING_RULES, default scoring_rules.json);
+# with the default rules it scores exactly like score_grant
+score_normalized_grant = compile_normalized_scorer(RULES)
+score_normalized_grant.__doc__ = """score_grant for a prepared UserQuery and NormalizedGrant.
+
+    `today` is passed in so a request evaluates every grant against one date.
+    `mentioned` (the description contains one of the interests) and
+    `is_open` (the deadline has not passed) can be supplied when the caller
+    already knows them, see DescriptionIndex and DeadlineIndex.
+    """
+
+
+@lru_cache(maxsize=8)
+def normalized_scorer(rules):
+    """score_normalized_grant for another rule set (a tuple of Rules),
+    compiled once per rule set."""
+    return compile_normalized_scorer(rules)
@@ -0,0 +1,154 @@
+"""Declarative scoring rules, compiled into specialised scorers.
+
+A rules file (JSON, see scoring_rules.json) lists the rules a grant can
+earn points from:
+
+    {"name": "race", "match": "contains", "user": ["race"],
+     "grant": "eligibility_criteria", "weight": 20, "casefold": true}
+
+Match types:
+
+- contains: a grant tag column holds one of the user's field values
+- substring: the grant description contains one of the user's values
+- open_deadline: the grant deadline is missing or not yet passed
+
+Rules are compiled once, at startup, into plain Python functions by
+generating their source, so a tuned rule set runs the same code a
+hand-written scorer would. BatchScorer evaluates the same rules with
+array operations.
+"""
+import json
+import os
+from typing import NamedTuple
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "scoring_rules.json")
+
+MATCH_TYPES = ("contains", "substring", "open_deadline")
+TAG_FIELDS = ("target_group", "location_eligible", "sectors", "eligibility_criteria")
+# user fields a rule can read; True for list-valued ones
+USER_FIELDS = {"user_type": False, "location": False, "major": False, "race": False, "interests": True}
+
+# contains rules the prepared UserQuery, NormalizedGrant and EligibilityIndex
+# can answer: (grant column, user fields, casefold) -> condition source
+NORMALIZED_CONTAINS = {
+    ("target_group", ("user_type",), False): "query.user_type in grant.target_group",
+    ("location_eligible", ("location",), False): "query.location in grant.location_eligible",
+    ("sectors", ("interests", "major"), False): "not query.sector_terms.isdisjoint(grant.sectors)",
+    ("eligibility_criteria", ("race",), True): "query.race in grant.eligibility_criteria",
+}
+# the UserQuery attribute whose terms each of those rules looks up
+NORMALIZED_TERMS = {
+    ("target_group", ("user_type",), False): "user_type",
+    ("location_eligible", ("location",), False): "location",
+    ("sectors", ("interests", "major"), False): "sector_terms",
+    ("eligibility_criteria", ("race",), True): "race",
+}
+
+
+class Rule(NamedTuple):
+    name: str
+    match: str
+    grant: str
+    weight: int
+    user: tuple = ()
+    casefold: bool = False
+
+    def user_terms(self, user):
+        """The user's values this rule compares, case-folded if it asks for that."""
+        terms = []
+        for field in self.user:
+            terms.extend(user[field] if USER_FIELDS[field] else [user[field]])
+        return [term.lower() for term in terms] if self.casefold else terms
+
+
+def parse_rules(config):
+    """Validate a rules document and return its Rule list; raises ValueError."""
+    rules = []
+    for raw in config.get("rules", []):
+        name = raw.get("name") or f"rule {len(rules) + 1}"
+        rule = Rule(
+            name=name,
+            match=raw.get("match"),
+            grant=raw.get("grant"),
+            weight=raw.get("weight"),
+            user=tuple(raw.get("user", ())),
+            casefold=bool(raw.get("casefold", False)),
+        )
+        if rule.match not in MATCH_TYPES:
+            raise ValueError(f"{name}: match must be one of {', '.join(MATCH_TYPES)}")
+        if not isinstance(rule.weight, int) or isinstance(rule.weight, bool):
+            raise ValueError(f"{name}: weight must be an integer")
+        unknown = [field for field in rule.user if field not in USER_FIELDS]
+        if unknown:
+            raise ValueError(f"{name}: unknown user fields {unknown}")
+        if rule.match == "contains" and rule.grant not in TAG_FIELDS:
+            raise ValueError(f"{name}: contains rules compare a tag column ({', '.join(TAG_FIELDS)})")
+        if rule.match == "substring" and (rule.grant != "description" or not rule.casefold):
+            raise ValueError(f"{name}: substring rules search the case-folded description")
+        if rule.match == "open_deadline" and (rule.grant != "deadline" or rule.user):
+            raise ValueError(f"{name}: open_deadline rules read only the deadline column")
+        if rule.match != "open_deadline" and not rule.user:
+            raise ValueError(f"{name}: needs at least one user field")
+        rules.append(rule)
+    return rules
+
+
+def load_rules(path=None):
+    """Rules from `path`, the SCORING_RULES file, or the bundled defaults."""
+    path = path or os.getenv("SCORING_RULES") or DEFAULT_RULES_PATH
+    with open(path) as f:
+        return parse_rules(json.load(f))
+
+
+def _compile(source, name, namespace):
+    namespace = dict(namespace)
+    exec(compile(source, f"<scoring rules: {name}>", "exec"), namespace)
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+def compile_normalized_scorer(rules):
+    """score(query, grant, today, mentioned=None, is_open=None) over a
+    UserQuery and NormalizedGrant, the form /match-grants scores.
+
+    Only the rule shapes the prepared forms and the eligibility index
+    cover are accepted; their weights can be tuned freely. Raises
+    ValueError for anything else.
+    """
+    lines = ["def score(query, grant, today, mentioned=None, is_open=None):", "    score = 0"]
+    seen = set()
+    for rule in rules:
+        if rule.match in ("substring", "open_deadline"):
+            if rule.match in seen:
+                raise ValueError(f"{rule.name}: only one {rule.match} rule is supported")
+            seen.add(rule.match)
+        if not rule.weight:
+            continue
+        if rule.match == "contains":
+            condition = NORMALIZED_CONTAINS.get((rule.grant, tuple(sorted(rule.user)), rule.casefold))
+            if condition is None:
+                raise ValueError(f"{rule.name}: not a contains rule the match index supports")
+            lines += [f"    if {condition}:", f"        score += {rule.weight}"]
+        elif rule.match == "open_deadline":
+            lines += [
+                "    if is_open is None:",
+                "        is_open = grant.open_until >= today",
+                "    if is_open:",
+                f"        score += {rule.weight}",
+            ]
+        else:
+            if rule.user != ("interests",):
+                raise ValueError(f"{rule.name}: the description index only searches for interests")
+            lines += [
+                "    if mentioned is None:",
+                "        mentioned = any(i in grant.description for i in query.interests)",
+                "    if mentioned:",
+                f"        score += {rule.weight}",
+            ]
+    lines.append("    return score")
+    return _compile("\n".join(lines) + "\n", "score", {})
+
+
+# the rules /match-grants and the other scorers use, loaded once per process
+RULES = load_rules()
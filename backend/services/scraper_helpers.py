@@ -1,17 +1,4 @@
-import requests
-from bs4 import BeautifulSoup
-from supabase import create_client, Client
-from dateutil import parser as dateparser
-import os
-import time
 import re
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 BASE_URL = "https://bold.org"
 BROWSE_URL = f"{BASE_URL}/scholarships/"
@@ -92,6 +79,8 @@ def parse_deadline(text):
                 if re.match(r"\d{4}-\d{2}-\d{2}", date_str):
                     return date_str
                 else:
+                    # imported here so the other helpers work without dateutil
+                    from dateutil import parser as dateparser
                     return dateparser.parse(date_str).date().isoformat()
             except:
                 continue
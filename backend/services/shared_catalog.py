@@ -0,0 +1,204 @@
+"""Score a BatchScorer-encoded catalog from several processes at once.
+
+SharedCatalog writes the encoded arrays and the description corpus into
+one memory-mapped file (on /dev/shm when available). Worker processes map
+the same file read-only, so the catalog is shared through the page cache
+instead of being copied into each worker. Grants are split into
+contiguous shards; each worker returns its shard's top matches and the
+partial lists are merged.
+"""
+import heapq
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from .batch_scorer import DESCRIPTION_SEPARATOR, BatchScorer
+
+SEPARATOR = DESCRIPTION_SEPARATOR.encode("utf-8")
+ALIGNMENT = 64
+
+# set in each pool worker by _attach_worker
+_worker_catalog = None
+
+
+class SharedCatalog:
+    """Read-only view of an encoded catalog backed by a memory-mapped file.
+
+    Build one with `create()` in the parent and `attach(layout)` in workers.
+    """
+
+    def __init__(self, layout, owner=False):
+        self.layout = layout
+        self.size = layout["size"]
+        self._owner = owner
+        self._file = open(layout["path"], "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.arrays = {
+            name: np.frombuffer(self._mmap, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+            for name, (offset, dtype, shape) in layout["arrays"].items()
+        }
+        self.corpus_offset = layout["corpus_offset"]
+        self.vocabularies = layout["vocabularies"]
+        self.rules = layout["rules"]
+
+    @classmethod
+    def create(cls, grants, directory=None, rules=None):
+        """Encode `grants` and write them to a new file; the caller owns it."""
+        scorer = BatchScorer(grants, rules)
+        ids = [str(g["id"]) for g in grants]
+        id_ranks = np.empty(len(ids), dtype=np.int64)
+        id_ranks[np.argsort(np.array(ids, dtype=object), kind="stable")] = np.arange(len(ids))
+        starts = [0]
+        for description in scorer.descriptions:
+            starts.append(starts[-1] + len(description.encode("utf-8")) + len(SEPARATOR))
+        arrays = {_tag_key(*key): matrix.matrix for key, matrix in scorer.tags.items()}
+        arrays["deadlines"] = scorer.deadlines
+        arrays["id_ranks"] = id_ranks
+        arrays["starts"] = np.array(starts, dtype=np.int64)
+        vocabularies = {_tag_key(*key): matrix.vocabulary for key, matrix in scorer.tags.items()}
+        corpus = scorer.corpus.encode("utf-8")
+
+        if directory is None and os.path.isdir("/dev/shm"):
+            directory = "/dev/shm"
+        fd, path = tempfile.mkstemp(prefix="grant-catalog-", suffix=".bin", dir=directory)
+        layout = {
+            "path": path, "size": len(grants), "rules": scorer.rules, "arrays": {}, "vocabularies": vocabularies,
+        }
+        with os.fdopen(fd, "wb") as f:
+            for name, array in arrays.items():
+                f.write(b"\0" * (-f.tell() % ALIGNMENT))
+                layout["arrays"][name] = (f.tell(), array.dtype.str, array.shape)
+                f.write(np.ascontiguousarray(array).tobytes())
+            layout["corpus_offset"] = f.tell()
+            # the trailing separator ends the last description and keeps the
+            # file non-empty so it can always be mapped
+            f.write(corpus + SEPARATOR)
+        return cls(layout, owner=True)
+
+    @classmethod
+    def attach(cls, layout):
+        return cls(layout)
+
+    def close(self):
+        self.arrays = {}
+        self._mmap.close()
+        self._file.close()
+        if self._owner:
+            os.unlink(self.layout["path"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _any_of(self, key, tags, lo, hi):
+        vocabulary = self.vocabularies[key]
+        ids = [vocabulary[t] for t in tags if t in vocabulary]
+        if not ids:
+            return np.zeros(hi - lo, dtype=bool)
+        return self.arrays[key][ids, lo:hi].any(axis=0)
+
+    def _mentions(self, interests, lo, hi):
+        starts = self.arrays["starts"]
+        base = self.corpus_offset
+        hits = np.zeros(hi - lo, dtype=bool)
+        for interest in interests:
+            needle = interest.lower().encode("utf-8")
+            if not needle:
+                hits[:] = True
+                break
+            if SEPARATOR in needle:
+                for row in range(lo, hi):
+                    start, end = base + int(starts[row]), base + int(starts[row + 1]) - len(SEPARATOR)
+                    hits[row - lo] |= needle in self._mmap[start:end]
+                continue
+            # UTF-8 is self-synchronizing, so a byte match is a character
+            # match; after each hit, skip to the next description
+            end = base + int(starts[hi])
+            positions = []
+            pos = self._mmap.find(needle, base + int(starts[lo]), end)
+            while pos != -1:
+                positions.append(pos - base)
+                pos = self._mmap.find(SEPARATOR, pos + len(needle), end)
+                if pos == -1:
+                    break
+                pos = self._mmap.find(needle, pos + len(SEPARATOR), end)
+            if positions:
+                hits[np.searchsorted(starts, positions, side="right") - 1 - lo] = True
+        return hits
+
+    def top_shard(self, user, lo, hi, limit, today):
+        """Best `limit` (score, id_rank, row_id) in rows [lo, hi) for one user.
+
+        Only grants that earn points from a rule other than the open
+        deadline are returned, as in /match-grants.
+        """
+        scores = np.zeros(hi - lo, dtype=np.int64)
+        relevant = np.zeros(hi - lo, dtype=bool)
+        for rule in self.rules:
+            if not rule.weight:
+                continue
+            if rule.match == "contains":
+                mask = self._any_of(_tag_key(rule.grant, rule.casefold), rule.user_terms(user), lo, hi)
+            elif rule.match == "substring":
+                mask = self._mentions(rule.user_terms(user), lo, hi)
+            else:
+                scores += rule.weight * (self.arrays["deadlines"][lo:hi] >= today)
+                continue
+            scores += rule.weight * mask
+            relevant |= mask
+        rows = np.flatnonzero(relevant)
+        id_ranks = self.arrays["id_ranks"][lo:hi][rows]
+        order = np.lexsort((id_ranks, -scores[rows]))[:limit]
+        return [(int(scores[rows[i]]), int(id_ranks[i]), lo + int(rows[i])) for i in order]
+
+
+def _tag_key(field, casefold):
+    return f"tags:{field}:{'folded' if casefold else 'exact'}"
+
+
+def shard_bounds(size, shards):
+    edges = np.linspace(0, size, shards + 1).astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+
+
+def merge_top(partials, limit):
+    """Merge per-shard (score, id_rank, row_id) lists into one ranked top list."""
+    return heapq.nsmallest(limit, (e for p in partials for e in p), key=lambda e: (-e[0], e[1]))
+
+
+def _attach_worker(layout):
+    global _worker_catalog
+    _worker_catalog = SharedCatalog.attach(layout)
+
+
+def _score_shard(users, lo, hi, limit, today):
+    return [_worker_catalog.top_shard(user, lo, hi, limit, today) for user in users]
+
+
+def top_matches_sharded(shared, users, limit=20, workers=None, today=None, batch_size=256):
+    """Yield the top (score, id_rank, row_id) list for each user, in order.
+
+    Every worker maps the shared catalog once and scores its own shard of
+    grants for a batch of users at a time.
+    """
+    today = (today or date.today()).toordinal()
+    workers = workers or os.cpu_count() or 1
+    bounds = shard_bounds(shared.size, workers)
+    users = list(users)
+    if not bounds:
+        for _ in users:
+            yield []
+        return
+    with ProcessPoolExecutor(len(bounds), initializer=_attach_worker, initargs=(shared.layout,)) as pool:
+        for start in range(0, len(users), batch_size):
+            batch = users[start:start + batch_size]
+            futures = [pool.submit(_score_shard, batch, lo, hi, limit, today) for lo, hi in bounds]
+            per_shard = [future.result() for future in futures]
+            for i in range(len(batch)):
+                yield merge_top([shard[i] for shard in per_shard], limit)
@@ -0,0 +1,132 @@
+"""The Supabase client shared by the API and the scrapers.
+
+Every client SupabaseFactory makes sends its requests through one
+httpx.Client, so PostgREST, RPC and GoTrue calls reuse the same pool of
+keep-alive connections instead of each opening their own.
+
+Pool settings (SUPABASE_* environment variables):
+
+- MAX_CONNECTIONS: open connections at most (default 20)
+- MAX_KEEPALIVE: idle connections kept for reuse (default 10)
+- KEEPALIVE_EXPIRY: seconds an idle connection is kept (default 30)
+- TIMEOUT / CONNECT_TIMEOUT: request and connect timeouts in seconds
+  (default 10 and 5)
+
+httpx and supabase are imported on first use, which keeps them out of
+application startup.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+
+class SupabaseFactory:
+    """Creates the Supabase client on first use and hands out the same one.
+
+    The URL and key are read from SUPABASE_URL and SUPABASE_KEY when the
+    client is first needed, not when the factory is made.
+    """
+
+    def __init__(
+        self,
+        url=None,
+        key=None,
+        max_connections=20,
+        max_keepalive=10,
+        keepalive_expiry=30.0,
+        timeout=10.0,
+        connect_timeout=5.0,
+    ):
+        self.url = url
+        self.key = key
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._http = None
+        self._client = None
+        self._override = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(
+            max_connections=int(environ.get("SUPABASE_MAX_CONNECTIONS", "20")),
+            max_keepalive=int(environ.get("SUPABASE_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(environ.get("SUPABASE_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(environ.get("SUPABASE_TIMEOUT", "10")),
+            connect_timeout=float(environ.get("SUPABASE_CONNECT_TIMEOUT", "5")),
+        )
+
+    def http(self):
+        """The pooled HTTP client every Supabase client uses."""
+        with self._lock:
+            if self._http is None:
+                import httpx
+
+                limits = httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                )
+                timeout = httpx.Timeout(self.timeout, connect=self.connect_timeout)
+                self._http = httpx.Client(limits=limits, timeout=timeout)
+            return self._http
+
+    def _create(self):
+        from supabase import ClientOptions, create_client
+
+        options = ClientOptions(
+            httpx_client=self.http(),
+            # the shared client never signs in, so it has no session to keep
+            persist_session=False,
+            auto_refresh_token=False,
+        )
+        return create_client(
+            self.url or os.getenv("SUPABASE_URL"), self.key or os.getenv("SUPABASE_KEY"), options
+        )
+
+    def client(self):
+        """The shared client, for table, RPC and token lookups."""
+        if self._override is not None:
+            return self._override
+        with self._lock:
+            if self._client is None:
+                self._client = self._create()
+            return self._client
+
+    def session_client(self):
+        """A new client on the same pool, for sign-up and sign-in.
+
+        Signing in stores the session on the client and switches its
+        requests to the user's token, so those calls never use the
+        shared one.
+        """
+        if self._override is not None:
+            return self._override
+        return self._create()
+
+    @contextmanager
+    def override(self, client):
+        """Hand out `client` (e.g. an in-memory stand-in) inside the block."""
+        previous, self._override = self._override, client
+        try:
+            yield client
+        finally:
+            self._override = previous
+
+    def close(self):
+        """Close the pool; the next call opens a new one."""
+        with self._lock:
+            http, self._http, self._client = self._http, None, None
+        if http is not None:
+            http.close()
+
+
+supabase_factory = SupabaseFactory.from_env(os.environ)
+
+
+def get_supabase():
+    """The app's Supabase client; also usable as a FastAPI dependency."""
+    return supabase_factory.client()
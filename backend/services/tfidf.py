@@ -0,0 +1,61 @@
+from collections import Counter
+
+import numpy as np
+
+from .normalized_grant import TOKEN_RE, normalize_snapshot
+
+
+class TfidfModel:
+    """TF-IDF vectors of grant descriptions, stored column-wise (term ->
+    grant rows) so a user query vector touches only its own terms.
+
+    Rows are L2-normalized, so `similarity` returns cosine similarities.
+    Uses smoothed idf: log((1 + n) / (1 + df)) + 1.
+    """
+
+    def __init__(self, grants):
+        self.size = len(grants)
+        self.vocabulary = {}
+        rows, cols, counts = [], [], []
+        for row_id, grant in enumerate(grants):
+            for term, count in Counter(TOKEN_RE.findall(grant.description)).items():
+                rows.append(row_id)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        values = np.array(counts, dtype=np.float64)
+
+        document_frequency = np.bincount(cols, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + self.size) / (1 + document_frequency)) + 1
+        values *= self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=self.size))
+        values /= norms[rows]
+
+        order = np.argsort(cols, kind="stable")
+        self.rows = rows[order]
+        self.values = values[order]
+        self.indptr = np.concatenate(([0], np.cumsum(document_frequency)))
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot.derived("normalized_grants", normalize_snapshot))
+
+    def similarity(self, text):
+        """Cosine similarity between `text` and every grant description."""
+        counts = Counter(t for t in TOKEN_RE.findall(text.lower()) if t in self.vocabulary)
+        if not counts:
+            return np.zeros(self.size)
+        term_ids = np.array([self.vocabulary[t] for t in counts], dtype=np.int64)
+        weights = np.array(list(counts.values()), dtype=np.float64) * self.idf[term_ids]
+        weights /= np.linalg.norm(weights)
+        # sparse matrix-vector product over the query's columns only
+        starts = self.indptr[term_ids]
+        lengths = self.indptr[term_ids + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        return np.bincount(
+            self.rows[positions],
+            weights=self.values[positions] * np.repeat(weights, lengths),
+            minlength=self.size,
+        )
@@ -0,0 +1,148 @@
+"""Cache of verified bearer tokens.
+
+Entries are keyed by a SHA-256 digest of the token, so raw tokens are
+never kept, and live no longer than the token's own `exp`. Concurrent
+lookups of one uncached token share a single verification.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import jwt
+
+
+class RevokedTokenError(Exception):
+    """The token was revoked (the user logged out) before it expired."""
+
+
+def token_digest(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def token_expiry(token):
+    """The token's `exp` claim, read without verifying it, or None."""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return None
+    return exp if isinstance(exp, (int, float)) else None
+
+
+class TokenCache:
+    """Thread-safe LRU of token digest -> user.
+
+    An entry expires after `ttl` seconds or at the token's `exp`,
+    whichever comes first. Revoked tokens are remembered until they
+    expire so they cannot be verified again; at most `max_revoked` are
+    kept, dropping the ones that expire soonest. Revocations live in this
+    process only, so other workers accept a revoked token until their
+    own cache entry for it expires.
+    """
+
+    def __init__(self, max_size=4096, ttl=300.0, clock=time.time, max_revoked=None):
+        self.max_size = max_size
+        self.max_revoked = max_revoked if max_revoked is not None else max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # digest -> (expires_at, user)
+        self._revoked = {}  # digest -> expires_at
+        self._inflight = {}  # digest -> Future shared by concurrent callers
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_verify(self, token, verify):
+        """The user for `token`, calling `verify(token)` on a cache miss.
+
+        Raises RevokedTokenError for revoked tokens, and whatever `verify`
+        raises for invalid ones; failures are not cached.
+        """
+        digest = token_digest(token)
+        with self._lock:
+            now = self._clock()
+            if digest in self._revoked:
+                raise RevokedTokenError("Token has been revoked")
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[digest]
+            call = self._inflight.get(digest)
+            leader = call is None
+            if leader:
+                self.misses += 1
+                call = self._inflight[digest] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return call.result()
+
+        try:
+            user = verify(token)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[digest]
+            call.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[digest]
+            if digest not in self._revoked:
+                self._store(digest, token, user)
+        call.set_result(user)
+        return user
+
+    def _store(self, digest, token, user):
+        expires_at = self._clock() + self.ttl
+        exp = token_expiry(token)
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        self._entries[digest] = (expires_at, user)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def revoke(self, token, expires_at=None):
+        """Forget a verified token and refuse it until `expires_at`, e.g. on logout.
+
+        `expires_at` should be the `exp` of the verified claims; without
+        it the token is refused for `ttl` seconds.
+        """
+        digest = token_digest(token)
+        with self._lock:
+            now = self._clock()
+            self._entries.pop(digest, None)
+            # drop revocations that have expired anyway
+            for revoked, until in list(self._revoked.items()):
+                if until <= now:
+                    del self._revoked[revoked]
+            self._revoked[digest] = expires_at if expires_at is not None else now + self.ttl
+            while len(self._revoked) > self.max_revoked:
+                del self._revoked[min(self._revoked, key=self._revoked.get)]
+
+    def is_revoked(self, token):
+        with self._lock:
+            expires_at = self._revoked.get(token_digest(token))
+            return expires_at is not None and expires_at > self._clock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
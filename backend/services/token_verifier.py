@@ -0,0 +1,171 @@
+"""Local verification of Supabase access tokens.
+
+Supabase signs access tokens either with the project's shared JWT secret
+(HS256) or with an asymmetric key published as a JWKS under
+/auth/v1/.well-known/jwks.json. TokenVerifier checks the signature,
+`exp`, `aud` and `sub` without calling GoTrue. The JWKS is cached,
+refreshed by a background thread, and re-fetched early when a token
+names a key id it has not seen yet.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+import jwt
+
+from .supabase_client import supabase_factory
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+# never re-fetch the JWKS for unknown key ids, or retry a failed fetch,
+# more often than this
+MIN_REFRESH_INTERVAL = 30.0
+
+
+class TokenUser(NamedTuple):
+    """The user a verified token was issued to; `id` and `email` mirror GoTrue's User."""
+
+    id: str
+    email: str
+    role: str
+    claims: dict
+
+
+def fetch_jwks(url, timeout=5.0):
+    # over the pooled connections the Supabase clients use
+    response = supabase_factory.http().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+class TokenVerifier:
+    """Verifies access tokens with a shared secret, a JWKS, or both.
+
+    `fetch_keys` returns the JWKS document as a dict; by default it is
+    downloaded from `jwks_url`.
+    """
+
+    def __init__(
+        self,
+        secret=None,
+        jwks_url=None,
+        audience="authenticated",
+        leeway=30,
+        refresh_interval=600.0,
+        fetch_keys=None,
+        clock=time.monotonic,
+    ):
+        self.secret = secret
+        self.jwks_url = jwks_url
+        self.audience = audience
+        self.leeway = leeway
+        self.refresh_interval = refresh_interval
+        self._fetch_keys = fetch_keys or (lambda: fetch_jwks(jwks_url))
+        self._clock = clock
+        self._keys = None
+        self._attempted_at = None
+        self._error = None  # why the last fetch failed, None if it succeeded
+        self._pending = None  # Future of the fetch in flight
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, environ):
+        """A verifier for SUPABASE_JWT_SECRET and/or the project JWKS, or None."""
+        secret = environ.get("SUPABASE_JWT_SECRET")
+        url = environ.get("SUPABASE_URL")
+        jwks_url = f"{url.rstrip('/')}/auth/v1/.well-known/jwks.json" if url else None
+        if not secret and not jwks_url:
+            return None
+        return cls(secret, jwks_url, audience=environ.get("SUPABASE_JWT_AUDIENCE", "authenticated"))
+
+    def verify(self, token):
+        """Claims of a valid token; raises jwt.InvalidTokenError otherwise."""
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            if not self.secret:
+                raise jwt.InvalidTokenError("No JWT secret configured for HS256 tokens")
+            key = self.secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS and self.jwks_url:
+            key = self._signing_key(header.get("kid"))
+        else:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {algorithm}")
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            leeway=self.leeway,
+            options={"require": ["exp", "aud", "sub"]},
+        )
+
+    def user(self, token):
+        claims = self.verify(token)
+        return TokenUser(id=claims["sub"], email=claims.get("email"), role=claims.get("role"), claims=claims)
+
+    def _signing_key(self, kid):
+        self.ensure_started()
+        keys = self._keys
+        if keys is None or kid not in keys:
+            try:
+                keys = self.refresh(force=keys is None)
+            except Exception as e:
+                raise jwt.InvalidTokenError(f"Could not load signing keys: {e}") from e
+        if kid not in keys:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return keys[kid].key
+
+    def refresh(self, force=True):
+        """Re-fetch the JWKS and return {kid: key}.
+
+        Without `force`, nothing is fetched if the last fetch was less than
+        MIN_REFRESH_INTERVAL ago. A failed fetch backs off the same way,
+        forced or not, and keeps the keys loaded before it. The fetch runs
+        outside the lock, and concurrent callers wait for the one in flight.
+        """
+        with self._lock:
+            pending = self._pending
+            if pending is None:
+                now = self._clock()
+                recent = self._attempted_at is not None and now - self._attempted_at < MIN_REFRESH_INTERVAL
+                if recent and (self._error is not None or not force):
+                    if self._keys is None:
+                        raise RuntimeError(f"JWKS fetch failed: {self._error}")
+                    return self._keys
+                pending = self._pending = Future()
+                fetching = True
+            else:
+                fetching = False
+        if not fetching:
+            return pending.result()
+        try:
+            jwk_set = jwt.PyJWKSet.from_dict(self._fetch_keys())
+            keys = {key.key_id: key for key in jwk_set.keys}
+        except Exception as e:
+            with self._lock:
+                self._error, self._attempted_at, self._pending = e, now, None
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            self._keys, self._error, self._attempted_at, self._pending = keys, None, now, None
+        pending.set_result(keys)
+        return keys
+
+    def ensure_started(self):
+        """Start the background JWKS refresh thread once."""
+        with self._lock:
+            if self._thread is None and self.refresh_interval:
+                self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"JWKS refresh failed: {e}")
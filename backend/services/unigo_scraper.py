@@ -1,18 +1,8 @@
-from playwright.sync_api import sync_playwright
 import time
 from scraper_helpers import parse_amount, parse_deadline, extract_description, infer_tags
-from bs4 import BeautifulSoup
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from supabase_client import get_supabase
 import re
 
-# Load Supabase credentials
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 BASE_URL = "https://www.unigo.com/scholarships/our-scholarships"
 
 def extract_official_rules(soup):
@@ -70,6 +60,10 @@ def extract_official_rules(soup):
     return None
 
 def scrape_unigo():
+    # Playwright and BeautifulSoup are only needed when actually scraping
+    from playwright.sync_api import sync_playwright
+    from bs4 import BeautifulSoup
+
     print("🚀 Launching Playwright Unigo scraper...")
     results = []
 
@@ -764,12 +758,17 @@ def scrape_unigo():
 
 # Upload to Supabase
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    # Load Supabase credentials
+    load_dotenv()
     data = scrape_unigo()
 
     if not data:
         print("⚠️ No data to upload.")
     else:
         print(f"📤 Uploading {len(data)} scholarships to Supabase...")
+        supabase = get_supabase()
 
         for i, item in enumerate(data):
             # Skip if required fields are missing or invalid
@@ -0,0 +1,377 @@
+"""Materialized per-user matches kept current by incremental re-scoring.
+
+UserMatchStore holds each user's best scored grants. MatchRecomputer keeps
+it in step with the grants catalog and the stored profiles: a changed grant
+is re-scored only against users whose tags or interests can match it,
+and a changed profile only recomputes that user.
+"""
+import heapq
+import threading
+from collections import defaultdict
+from datetime import date
+
+from .grant_catalog import diff_snapshots
+from .grant_index import candidate_terms
+from .match_engine import score_candidates
+from .normalized_grant import normalize_snapshot, prepare_user
+from .ranking import encode_cursor, iter_ranked, paginate, rank_key, top_k
+from .score_grant import normalized_scorer, score_normalized_grant
+from .scoring_rules import RULES
+
+# matches kept per user: enough for the first pages of GET /me/matches
+MATCHES_PER_USER = 100
+
+
+def _ranked_items(scores, n):
+    """The best `n` (grant_id, score) pairs of a {grant id: score} mapping."""
+    return heapq.nsmallest(n, scores.items(), key=lambda item: rank_key(item[1], item[0]))
+
+
+class UserMatchStore:
+    """user id -> their best `limit` {grant id: score}, with a reverse
+    grant -> users map.
+
+    A user with more scoring grants than `limit` is marked incomplete: reads
+    that run past the kept matches return None, and a change that may let a
+    grant that was cut off back into the top is reported so the caller can
+    recompute that user.
+    """
+
+    def __init__(self, limit=MATCHES_PER_USER):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._by_user = {}
+        self._complete = {}
+        self._by_grant = defaultdict(set)
+
+    def replace_user(self, user_id, scores):
+        with self._lock:
+            self._drop_user(user_id)
+            kept = _ranked_items(scores, self.limit + 1)
+            self._complete[user_id] = len(kept) <= self.limit
+            self._by_user[user_id] = dict(kept[:self.limit])
+            for grant_id in self._by_user[user_id]:
+                self._by_grant[grant_id].add(user_id)
+
+    def remove_user(self, user_id):
+        with self._lock:
+            self._drop_user(user_id)
+
+    def _drop_user(self, user_id):
+        self._complete.pop(user_id, None)
+        for grant_id in self._by_user.pop(user_id, {}):
+            self._by_grant[grant_id].discard(user_id)
+
+    def _drop(self, user_id, grant_id):
+        del self._by_user[user_id][grant_id]
+        self._by_grant[grant_id].discard(user_id)
+
+    def set_score(self, user_id, grant_id, score):
+        """Store a score; a score of 0 or less removes the match.
+
+        Returns True when the user needs replace_user(): a kept match fell
+        while grants beyond `limit` were cut off, so one of those may now
+        rank above it.
+        """
+        with self._lock:
+            scores = self._by_user.setdefault(user_id, {})
+            complete = self._complete.setdefault(user_id, True)
+            old = scores.get(grant_id)
+            if score <= 0:
+                if old is None:
+                    return False
+                self._drop(user_id, grant_id)
+                return not complete
+            if old is None and len(scores) >= self.limit:
+                worst_id, worst = _ranked_items(scores, len(scores))[-1]
+                if rank_key(score, grant_id) > rank_key(worst, worst_id):
+                    self._complete[user_id] = False
+                    return False
+            scores[grant_id] = score
+            self._by_grant[grant_id].add(user_id)
+            if len(scores) > self.limit:
+                self._drop(user_id, _ranked_items(scores, len(scores))[-1][0])
+                self._complete[user_id] = False
+            return not complete and old is not None and score < old
+
+    def remove_grant(self, grant_id):
+        """Drop a grant everywhere; returns the users that need replace_user()."""
+        with self._lock:
+            stale = set()
+            for user_id in self._by_grant.pop(grant_id, set()):
+                self._by_user[user_id].pop(grant_id, None)
+                if not self._complete[user_id]:
+                    stale.add(user_id)
+            return stale
+
+    def user_ids(self):
+        with self._lock:
+            return set(self._by_user)
+
+    def users_with(self, grant_id):
+        with self._lock:
+            return set(self._by_grant.get(grant_id, ()))
+
+    def scores(self, user_id):
+        with self._lock:
+            return dict(self._by_user.get(user_id, {}))
+
+    def _entries(self, user_id):
+        with self._lock:
+            if user_id not in self._by_user:
+                # never stored: nothing is known about this user's matches
+                return [], False
+            scores = self._by_user[user_id]
+            entries = [(score, grant_id, grant_id) for grant_id, score in scores.items()]
+            return entries, self._complete.get(user_id, True)
+
+    def page(self, user_id, limit, after=None):
+        """One ranked page of (score, grant_id) for a user, plus the next
+        cursor; None for a user the store has not seen or when the page
+        runs past the matches kept for them."""
+        entries, complete = self._entries(user_id)
+        page, next_cursor = paginate(entries, limit, after)
+        if next_cursor is None and not complete:
+            if len(page) < limit:
+                return None
+            # the page ends on the last kept match; cut-off ones follow it
+            next_cursor = encode_cursor(page[-1][0], page[-1][1])
+        return [(score, grant_id) for score, grant_id, _ in page], next_cursor
+
+    def ranked(self, user_id, after=None):
+        """Every (score, grant_id) for a user in rank order, as an iterator;
+        None for a user the store has not seen or when not all of their
+        matches are kept."""
+        entries, complete = self._entries(user_id)
+        if not complete:
+            return None
+        return ((score, grant_id) for score, grant_id, _ in iter_ranked(entries, after))
+
+
+class MatchRecomputer:
+    """Keeps a UserMatchStore in step with a GrantCatalog and the profiles.
+
+    `load_profiles` returns (user_id, user dict) pairs for every profile.
+    sync() reloads them and recomputes the users whose profile changed, so
+    profiles written by other workers or straight to Supabase are picked
+    up too; profile_changed() only applies a save without waiting for it.
+    `rules` replaces the active scoring rules, as in score_candidates.
+    """
+
+    def __init__(self, store, catalog, load_profiles, rules=None):
+        self.store = store
+        self.rules = rules
+        self._score = score_normalized_grant if rules is None else normalized_scorer(tuple(rules))
+        self.catalog = catalog
+        self._load_profiles = load_profiles
+        self._lock = threading.RLock()
+        self._loaded = False
+        # profile saves that arrive while a rebuild runs wait here instead
+        # of blocking the request on it; user id -> user dict, None if removed
+        self._pending_lock = threading.Lock()
+        self._building = False
+        self._pending = {}
+        self._snapshot = None
+        self._today = None
+        self._profiles = {}  # user id -> the user dict last applied
+        self._queries = {}
+        # which users can match a grant through each tag column, or
+        # through their interests in its description
+        self._by_tag = defaultdict(lambda: defaultdict(set))
+        self._by_interest = defaultdict(set)
+
+    @property
+    def ready(self):
+        """Whether the first rebuild has finished and the store can be read."""
+        return self._loaded
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.rebuild()
+
+    def rebuild(self):
+        """Recompute every profile against the current catalog."""
+        with self._lock:
+            with self._pending_lock:
+                self._building = True
+            self._snapshot = self.catalog.snapshot()
+            self._today = date.today()
+            self._queries.clear()
+            self._profiles.clear()
+            self._by_tag.clear()
+            self._by_interest.clear()
+            for user_id, user in self._load_profiles():
+                self._apply_profile(user_id, user)
+            for user_id in self.store.user_ids() - self._queries.keys():
+                self.store.remove_user(user_id)
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                for user_id, user in pending.items():
+                    self._apply_profile(user_id, user)
+                self._building = False
+                self._loaded = True
+
+    def profile_changed(self, user_id, user):
+        """Recompute one user after their profile was saved."""
+        with self._pending_lock:
+            if self._building or not self._loaded:
+                self._pending[user_id] = user  # applied when the rebuild ends
+                return
+        with self._lock:
+            self._apply_profile(user_id, user)
+
+    def profile_removed(self, user_id):
+        self.profile_changed(user_id, None)
+
+    def _apply_profile(self, user_id, user):
+        self._forget(user_id)
+        if user is None:
+            self._profiles.pop(user_id, None)
+            self.store.remove_user(user_id)
+            return
+        self._profiles[user_id] = user
+        self._remember(user_id, prepare_user(user))
+        self._recompute_user(user_id)
+
+    def _sync_profiles(self):
+        """Recompute the users whose stored profile changed since it was applied."""
+        profiles = dict(self._load_profiles())
+        for user_id in self._profiles.keys() - profiles.keys():
+            self._apply_profile(user_id, None)
+        for user_id, user in profiles.items():
+            if self._profiles.get(user_id) != user:
+                self._apply_profile(user_id, user)
+
+    def sync(self):
+        """Apply profile and catalog changes since the last call.
+
+        Only users whose profile changed, and grants whose updated_at moved
+        (or that are new), are re-scored. A new day recomputes everything,
+        since open-deadline bonuses change.
+        """
+        with self._lock:
+            if not self._loaded:
+                return self.rebuild()
+            if date.today() != self._today:
+                return self.rebuild()
+            self._sync_profiles()
+            snapshot = self.catalog.snapshot()
+            if snapshot is self._snapshot:
+                return
+            changed, removed = diff_snapshots(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            stale = set()
+            for grant_id in removed:
+                stale |= self.store.remove_grant(grant_id)
+            for user_id in stale:
+                self._recompute_user(user_id)
+            for row_id in changed:
+                self.grant_changed(row_id)
+
+    def grant_changed(self, row_id):
+        """Re-score one grant of the current snapshot against the users it can match."""
+        with self._lock:
+            grant = self._snapshot.derived("normalized_grants", normalize_snapshot)[row_id]
+            grant_id = str(self._snapshot.grants[row_id]["id"])
+            matching = self._users_matching(grant)
+            for user_id in matching | self.store.users_with(grant_id):
+                score = 0
+                if user_id in matching:
+                    score = self._score(self._queries[user_id], grant, self._today)
+                if self.store.set_score(user_id, grant_id, score):
+                    self._recompute_user(user_id)
+
+    def _users_matching(self, grant):
+        users = set()
+        for column, index in self._by_tag.items():
+            for tag in getattr(grant, column):
+                users |= index.get(tag, set())
+        description = grant.description
+        for interest, interested in self._by_interest.items():
+            if interest in description:
+                users |= interested
+        return users
+
+    def _recompute_user(self, user_id):
+        entries = score_candidates(self._snapshot, self._queries[user_id], self._today, rules=self.rules)
+        # one past the limit tells the store whether anything was cut off
+        top = top_k(entries, self.store.limit + 1)
+        self.store.replace_user(user_id, {grant_id: score for score, grant_id, _ in top})
+
+    def _field_indexes(self, query):
+        """(index, keys) pairs under which a user's query is registered:
+        only the fields a rule with a non-zero weight looks at."""
+        terms, searches_description = candidate_terms(query, RULES if self.rules is None else self.rules)
+        indexes = [(self._by_tag[column], keys) for column, keys in terms.items()]
+        if searches_description:
+            indexes.append((self._by_interest, query.interests))
+        return indexes
+
+    def _remember(self, user_id, query):
+        self._queries[user_id] = query
+        for index, keys in self._field_indexes(query):
+            for key in keys:
+                index[key].add(user_id)
+
+    def _forget(self, user_id):
+        query = self._queries.pop(user_id, None)
+        if query is None:
+            return
+        for index, keys in self._field_indexes(query):
+            for key in keys:
+                users = index.get(key)
+                if users is not None:
+                    users.discard(user_id)
+                    if not users:
+                        del index[key]
+
+
+class RecomputeWorker:
+    """Background thread that calls MatchRecomputer.sync() once on start,
+    which runs the first rebuild, then every `interval` seconds."""
+
+    def __init__(self, recomputer, interval=30.0):
+        self.recomputer = recomputer
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="user-matches-recompute", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        wait = 0
+        while not self._stop.wait(wait):
+            wait = self.interval
+            try:
+                self.recomputer.sync()
+            except Exception as e:
+                print(f"User match recompute failed: {e}")
+
+
+def check_consistency(store, snapshot, profiles, today=None, rules=None):
+    """Compare the store with a full re-score of every profile, cut to the
+    matches the store keeps per user, under `rules` if given.
+
+    Returns (user_id, grant_id, stored_score, expected_score) for every
+    difference; an empty list means the store is consistent.
+    """
+    today = today or date.today()
+    mismatches = []
+    for user_id, user in profiles:
+        entries = score_candidates(snapshot, prepare_user(user), today, rules=rules)
+        expected = {grant_id: score for score, grant_id, _ in top_k(entries, store.limit)}
+        stored = store.scores(user_id)
+        for grant_id in expected.keys() | stored.keys():
+            if expected.get(grant_id, 0) != stored.get(grant_id, 0):
+                mismatches.append((user_id, grant_id, stored.get(grant_id, 0), expected.get(grant_id, 0)))
+    return mismatches
@@ -0,0 +1,60 @@
+"""Memory held by the grant catalog, as dicts and as CompactGrant records.
+
+    python -m benchmarks.bench_memory              # per 100k grants
+    python -m benchmarks.bench_memory --size 10000
+
+Each form is measured twice: the rows alone, and the rows plus everything
+the first /match-grants request derives from them (normalized grants,
+eligibility, description and deadline indexes). Rows are round-tripped
+through JSON first so every row owns its strings, as rows decoded from a
+Supabase response do.
+"""
+import argparse
+import json
+import tracemalloc
+
+from backend.services.compact_grant import compact_grants
+from backend.services.grant_catalog import CatalogSnapshot
+from backend.services.match_engine import rank_matches
+
+from .synthetic import generate_grants, generate_users
+
+
+def footprint(payload, user, compact):
+    """(bytes held by the rows, bytes held once a first match has been ranked)"""
+    tracemalloc.start()
+    try:
+        grants = json.loads(payload)
+        if compact:
+            grants = compact_grants(grants)
+        rows_bytes = tracemalloc.get_traced_memory()[0]
+        snapshot = CatalogSnapshot(grants, None, 0)
+        rank_matches(snapshot, user, 20)
+        matched_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return rows_bytes, matched_bytes
+
+
+def measure(size, seed=0):
+    payload = json.dumps(generate_grants(size, seed))
+    user = generate_users(1, seed)[0]
+    result = {"grants": size}
+    for name, compact in (("dict", False), ("compact", True)):
+        rows_bytes, matched_bytes = footprint(payload, user, compact)
+        result[f"{name}_rows_mb"] = rows_bytes / 1e6
+        result[f"{name}_after_match_mb"] = matched_bytes / 1e6
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    result = measure(args.size, args.seed)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
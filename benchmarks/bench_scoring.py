@@ -0,0 +1,150 @@
+"""Scoring benchmarks over synthetic grant catalogs.
+
+    python -m benchmarks.bench_scoring                       # 1k, 10k, 100k, 1M rows
+    python -m benchmarks.bench_scoring --sizes 1000 10000 --output bench.json
+    python -m benchmarks.bench_scoring --compare bench.json  # diff against an earlier run
+
+Each catalog size runs in a fresh process so its peak RSS is its own.
+The /match-grants handler is called directly with its Supabase-backed
+catalog replaced by an in-memory one.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from .synthetic import generate_grants, generate_users
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# rough number of grant evaluations to spend per benchmark and size
+WORK_BUDGET = 500_000
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies, grants_per_call):
+    total = sum(latencies)
+    return {
+        "calls": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "grants_per_s": grants_per_call * len(latencies) / total if total else None,
+    }
+
+
+def timed(fn, users):
+    latencies = []
+    for user in users:
+        start = time.perf_counter()
+        fn(user)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_size(size, seed):
+    from backend.routers import match_grants as router
+    from backend.services.batch_scorer import BatchScorer
+    from backend.services.grant_catalog import GrantCatalog
+    from backend.services.score_grant import score_grant
+
+    grants = generate_grants(size, seed)
+    users = generate_users(max(5, min(200, WORK_BUDGET // size)), seed)
+    result = {"grants": size, "users": len(users)}
+
+    def score_all(user):
+        for grant in grants:
+            score_grant(user, grant)
+
+    result["score_grant"] = summarize(timed(score_all, users), size)
+
+    start = time.perf_counter()
+    scorer = BatchScorer(grants)
+    result["batch_scorer_build_s"] = time.perf_counter() - start
+    result["batch_scorer"] = summarize(timed(scorer.score, users), size)
+    del scorer
+
+    router.grant_catalog = GrantCatalog(lambda: grants)
+    router.match_cache = None  # measure scoring, not cache hits
+    profiles = [router.UserProfile(**user) for user in users]
+
+    def handler(profile):
+        router.match_grants(profile, limit=20, cursor=None, include_expired=True, similarity=False, fields=None, accept=None)
+
+    start = time.perf_counter()
+    handler(profiles[0])  # loads the catalog and builds its indexes
+    result["match_grants_first_call_s"] = time.perf_counter() - start
+    result["match_grants"] = summarize(timed(handler, profiles), size)
+
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def compare(previous, current):
+    """Print per-benchmark p50 changes between two result files."""
+    for size, result in current["results"].items():
+        before = previous["results"].get(size)
+        if not before:
+            continue
+        for name in ("score_grant", "batch_scorer", "match_grants"):
+            if name in result and name in before:
+                old, new = before[name]["p50_ms"], result[name]["p50_ms"]
+                print(f"{size:>9} {name:<13} p50 {old:10.3f} -> {new:10.3f} ms ({new / old - 1:+.1%})")
+        old, new = before["peak_rss_mb"], result["peak_rss_mb"]
+        print(f"{size:>9} {'peak_rss':<13}     {old:10.1f} -> {new:10.1f} MB ({new / old - 1:+.1%})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run_size, size, args.seed).result()
+        results[str(size)] = result
+        print(
+            f"{size:>9} grants  score_grant p50 {result['score_grant']['p50_ms']:9.2f} ms  "
+            f"batch p50 {result['batch_scorer']['p50_ms']:8.2f} ms  "
+            f"match-grants p50 {result['match_grants']['p50_ms']:8.2f} ms "
+            f"p99 {result['match_grants']['p99_ms']:8.2f} ms  "
+            f"peak {result['peak_rss_mb']:8.1f} MB",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
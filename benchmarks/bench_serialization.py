@@ -0,0 +1,93 @@
+"""Cost of encoding grant listings, per 1k grants.
+
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --grants 5000 --repeat 20
+
+Compares FastAPI's default path for a returned dict (jsonable_encoder,
+then JSONResponse's json.dumps), validating against the /match-grants
+response model and dumping it with pydantic, and encoding the dict
+directly with orjson, as the grant endpoints now do. Both the default list view columns and full
+rows with descriptions are measured.
+"""
+import argparse
+import json
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.responses import ORJSONResponse
+
+from .synthetic import generate_grants
+
+LIST_FIELDS = (
+    "id", "title", "amount", "deadline", "location_eligible", "target_group",
+    "sectors", "eligibility_criteria", "source_url",
+)
+
+
+def default_encoder(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def response_model_encoder():
+    import os
+
+    # the router creates a Supabase client at import; it is never used here
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark")
+    from backend.routers.match_grants import MatchGrantsResponse
+
+    def encode(payload):
+        return MatchGrantsResponse.model_validate(payload).model_dump_json(exclude_unset=True).encode()
+
+    return encode
+
+
+def orjson_encoder(payload):
+    return ORJSONResponse(payload).body
+
+
+def time_per_1k(encode, payload, size, repeat):
+    encode(payload)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(payload)
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1000 * 1000 / size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grants", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = [
+        {**grant, "id": f"{i:08d}-0000-0000-0000-000000000000", "score": 70}
+        for i, grant in enumerate(generate_grants(args.grants, args.seed))
+    ]
+    payloads = {
+        "list": {"grants": [{f: g.get(f) for f in (*LIST_FIELDS, "score")} for g in rows], "next_cursor": None},
+        "full": {"grants": rows, "next_cursor": None},
+    }
+    encoders = {
+        "jsonable_encoder+json": default_encoder,
+        "response_model": response_model_encoder(),
+        "orjson": orjson_encoder,
+    }
+    results = {}
+    for shape, payload in payloads.items():
+        assert orjson.loads(orjson_encoder(payload)) == json.loads(default_encoder(payload))
+        size_kb = len(orjson_encoder(payload)) / 1024
+        results[shape] = {"body_kb_per_1k": size_kb * 1000 / args.grants}
+        for name, encode in encoders.items():
+            results[shape][f"{name}_ms_per_1k"] = time_per_1k(encode, payload, args.grants, args.repeat)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
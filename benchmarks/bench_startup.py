@@ -0,0 +1,85 @@
+"""Cold-start import time of the API, from `python -X importtime`.
+
+    python -m benchmarks.bench_startup                 # builds main:app
+    python -m benchmarks.bench_startup --target "import backend.routers.auth"
+    python -m benchmarks.bench_startup --runs 5 --top 15
+
+Each run is a fresh interpreter without Supabase credentials, as on a new
+autoscaled worker, so the numbers include every module the target pulls in.
+Reports the median wall time and import time, the slowest imports by
+cumulative time, and whether modules that should load lazily (HTTP
+clients, scraper dependencies) were imported at startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGET = "from main import app"
+# only needed once a request reaches Supabase, or when scraping
+LAZY_MODULES = ("supabase", "httpx", "gotrue", "playwright", "bs4", "requests", "dateutil")
+
+
+def parse_importtime(stderr):
+    """(self_us, cumulative_us, depth, module) rows of an -X importtime log."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(own), int(cumulative), depth, name.strip()))
+    return rows
+
+
+def run_once(target):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SUPABASE_")}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", target],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(f"{target!r} failed:\n{result.stderr[-2000:]}")
+    return wall, parse_importtime(result.stderr)
+
+
+def measure(target=DEFAULT_TARGET, runs=3, top=10):
+    walls, imports = [], []
+    for _ in range(runs):
+        wall, rows = run_once(target)
+        walls.append(wall)
+        imports.append(rows)
+    # the slowest run's neighbours are noisy; report the median run's breakdown
+    median = sorted(range(runs), key=lambda i: walls[i])[runs // 2]
+    rows = imports[median]
+    modules = {name for _, _, _, name in rows}
+    top_level = sorted((r for r in rows if r[2] == 1), key=lambda r: -r[1])
+    return {
+        "target": target,
+        "runs": runs,
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(sum(r[1] for r in rows if r[2] == 1) / 1000, 1),
+        "modules": len(modules),
+        "slowest": [{"module": name, "cumulative_ms": round(cum / 1000, 1)} for _, cum, _, name in top_level[:top]],
+        "lazy_modules_imported": [m for m in LAZY_MODULES if m in modules],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="Python statement to time")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.target, args.runs, args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Synthetic grant catalogs and user profiles for benchmarks.
+
+Rows follow the shape of the sqlcode.txt seed data and of what the bold
+and unigo scrapers upload: mostly US student scholarships tagged with
+the scrapers' sector and demographic vocabularies, with descriptions of
+a few hundred to 5000 characters.
+"""
+import random
+from datetime import date, timedelta
+
+SECTORS = [
+    "STEM", "AI", "Engineering", "Healthcare", "Computer Science", "Technology",
+    "Mathematics", "Physics", "Chemistry", "Biology", "Medicine", "Nursing",
+    "Psychology", "Business", "Finance", "Economics", "Education", "Law",
+    "Journalism", "Arts", "Music", "Theater", "Literature", "History",
+    "Political Science", "Sociology", "Anthropology", "Philosophy",
+    "arts", "community", "civic leadership", "sustainability", "software", "research",
+]
+ELIGIBILITY = [
+    "first-gen", "BIPOC", "low-income background", "LGBTQ+", "women", "minority",
+    "disability", "female", "undergraduate", "Latinx", "Black", "Indigenous",
+    "youth", "volunteer", "first-generation", "low-income", "underrepresented",
+]
+LOCATIONS = ["USA"] * 8 + ["California", "Remote", "Canada", "Texas", "New York"]
+TARGET_GROUPS = ["students"] * 8 + ["nonprofits", "founders", "researchers"]
+RACES = ["Black", "Latinx", "Asian", "White", "Indigenous", "BIPOC", "Hispanic"]
+INTERESTS = [
+    "computer science", "music", "volunteering", "nursing", "robotics", "writing",
+    "community service", "art", "leadership", "environment", "mathematics",
+    "entrepreneurship", "public health", "film", "education", "sports",
+]
+FILLER = [
+    "scholarship", "award", "students", "applicants", "must", "essay", "eligible",
+    "college", "university", "enrolled", "accredited", "postsecondary", "institution",
+    "deadline", "winner", "selected", "financial", "support", "program", "year",
+    "degree", "high", "school", "senior", "graduate", "undergraduate", "community",
+    "service", "leadership", "demonstrate", "need", "merit", "gpa", "minimum",
+    "residents", "united", "states", "submit", "application", "letter", "recommendation",
+    "official", "rules", "sponsor", "judging", "criteria", "original", "notified", "email",
+]
+DESCRIPTION_WORDS = [w.lower() for w in SECTORS + ELIGIBILITY + INTERESTS] + FILLER * 4
+# distinct descriptions generated per catalog; rows draw from this pool so
+# million-row catalogs build in seconds
+DESCRIPTION_POOL_SIZE = 20_000
+
+
+def make_description(rng):
+    target_chars = min(5000, int(rng.lognormvariate(6.6, 0.8)))
+    parts = []
+    length = 0
+    while length < target_chars:
+        word = rng.choice(DESCRIPTION_WORDS)
+        parts.append(word)
+        length += len(word) + 1
+    text = " ".join(parts)[:target_chars]
+    return text[:1].upper() + text[1:] + "."
+
+
+def make_grant(rng, i, descriptions, today):
+    deadline = rng.random()
+    if deadline < 0.15:
+        deadline = None
+    else:
+        deadline = (today + timedelta(days=rng.randint(-180, 365))).isoformat()
+    return {
+        "id": f"00000000-0000-4000-8000-{i:012d}",
+        "title": f"{rng.choice(SECTORS)} Scholarship {i}",
+        "description": rng.choice(descriptions),
+        "amount": f"${rng.choice([500, 1000, 2500, 5000, 10000]):,}",
+        "deadline": deadline,
+        "location_eligible": rng.sample(LOCATIONS, rng.randint(1, 2)),
+        "target_group": rng.sample(TARGET_GROUPS, 1),
+        "sectors": rng.sample(SECTORS, rng.randint(0, 3)),
+        "eligibility_criteria": rng.sample(ELIGIBILITY, rng.randint(0, 3)),
+        "source_url": f"https://example.com/scholarships/{i}",
+        "updated_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+def generate_grants(n, seed=0):
+    rng = random.Random(seed)
+    descriptions = [make_description(rng) for _ in range(min(n, DESCRIPTION_POOL_SIZE))]
+    today = date.today()
+    return [make_grant(rng, i, descriptions, today) for i in range(n)]
+
+
+def generate_users(n, seed=0):
+    rng = random.Random(seed + 1)
+    return [
+        {
+            "user_type": rng.choice(TARGET_GROUPS),
+            "location": rng.choice(LOCATIONS),
+            "major": rng.choice(SECTORS),
+            "race": rng.choice(RACES),
+            "interests": rng.sample(INTERESTS, rng.randint(1, 4)),
+        }
+        for _ in range(n)
+    ]
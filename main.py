@@ -1,31 +1,57 @@
-from fastapi import FastAPI
-from fastapi.openapi.utils import get_openapi
-from backend.routers import profile, match_grants, auth
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # the Supabase client and its connection pool are created on first use;
+    # the first build of every user's matches runs in this background worker,
+    # not in the first GET /me/matches
+    from backend.routers.match_grants import recompute_worker
+    recompute_worker.ensure_started()
+    yield
+    recompute_worker.stop()
+    from backend.services.supabase_client import supabase_factory
+    supabase_factory.close()
 
-app.include_router(profile.router)
-app.include_router(match_grants.router)
-app.include_router(auth.router)
+def create_app():
+    """Build the API. .env is loaded once, before the routers read their settings;
+    no Supabase client or connection is made until a request needs one."""
+    from dotenv import load_dotenv
+    from fastapi import FastAPI
 
-@app.get("/")
-def read_root():
-    return {"message": "Granted API is running!"}
+    load_dotenv()
+    from backend.routers import profile, match_grants, auth, grants
 
-def custom_openapi():
+    app = FastAPI(lifespan=lifespan)
+
+    app.include_router(profile.router)
+    app.include_router(match_grants.router)
+    app.include_router(auth.router)
+    app.include_router(grants.router)
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Granted API is running!"}
+
+    app.openapi = lambda: custom_openapi(app)
+    return app
+
+def custom_openapi(app):
     if app.openapi_schema:
         return app.openapi_schema
+    # only needed when the schema is first requested
+    from fastapi.openapi.utils import get_openapi
+
     openapi_schema = get_openapi(
         title="Granted API",
         version="1.0.0",
         description="API for Granted",
         routes=app.routes,
     )
-    
+
     # Initialize components if it doesn't exist
     if "components" not in openapi_schema:
         openapi_schema["components"] = {}
-    
+
     openapi_schema["components"]["securitySchemes"] = {
         "bearerAuth": {
             "type": "http",
@@ -33,15 +59,21 @@ def custom_openapi():
             "bearerFormat": "JWT",
         }
     }
-    
+
     # Only add security to paths if paths exist
     if "paths" in openapi_schema:
         for path in openapi_schema["paths"]:
             for method in openapi_schema["paths"][path]:
                 if isinstance(openapi_schema["paths"][path][method], dict):
                     openapi_schema["paths"][path][method]["security"] = [{"bearerAuth": []}]
-    
+
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
-app.openapi = custom_openapi
\ No newline at end of file
+def __getattr__(name):
+    # `uvicorn main:app` builds the app on first access, so importing main
+    # (or create_app alone) does not import the routers
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,53 @@
+-- Indexes and an RPC so /match-grants can ask Postgres for candidate grants
+-- (GRANT_CANDIDATES=database) instead of loading the whole table.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- score_grant compares eligibility_criteria case-insensitively
+CREATE OR REPLACE FUNCTION lower_tags(tags text[]) RETURNS text[] AS $$
+  SELECT coalesce(array_agg(lower(t)), '{}') FROM unnest(tags) AS t;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE INDEX IF NOT EXISTS grants_target_group_idx ON grants USING gin (target_group);
+CREATE INDEX IF NOT EXISTS grants_location_eligible_idx ON grants USING gin (location_eligible);
+CREATE INDEX IF NOT EXISTS grants_sectors_idx ON grants USING gin (sectors);
+CREATE INDEX IF NOT EXISTS grants_eligibility_criteria_idx ON grants USING gin (lower_tags(eligibility_criteria));
+CREATE INDEX IF NOT EXISTS grants_description_trgm_idx ON grants USING gin (lower(coalesce(description, '')) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS grants_deadline_idx ON grants (deadline);
+
+-- Grants that can score more than the open-deadline bonus for a profile:
+-- they share a tag with it, or their description contains an interest.
+-- Each branch can use its own index; the union is then filtered by deadline.
+-- A NULL tag or an empty array matches nothing, which is how the caller
+-- (candidate_query.candidate_params) leaves out the branch of a scoring
+-- rule whose weight is zero.
+CREATE OR REPLACE FUNCTION match_grant_candidates(
+  p_user_type text,
+  p_location text,
+  p_sector_terms text[],
+  p_race text,
+  p_interests text[],
+  p_include_expired boolean DEFAULT true,
+  p_today date DEFAULT current_date
+) RETURNS SETOF grants AS $$
+  SELECT g.*
+  FROM grants g
+  WHERE g.id IN (
+    SELECT id FROM grants WHERE target_group && ARRAY[p_user_type]
+    UNION
+    SELECT id FROM grants WHERE location_eligible && ARRAY[p_location]
+    UNION
+    SELECT id FROM grants WHERE sectors && p_sector_terms
+    UNION
+    SELECT id FROM grants WHERE lower_tags(eligibility_criteria) && ARRAY[lower(p_race)]
+    UNION
+    SELECT d.id
+    FROM unnest(p_interests) AS i(interest)
+    CROSS JOIN LATERAL (
+      SELECT id FROM grants
+      WHERE lower(coalesce(description, '')) LIKE
+        '%' || replace(replace(replace(lower(i.interest), '\', '\\'), '%', '\%'), '_', '\_') || '%'
+    ) AS d
+  )
+  AND (p_include_expired OR g.deadline IS NULL OR g.deadline >= p_today);
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,17 @@
+-- The API's grant catalog is versioned by max(updated_at), so every write
+-- must move it. The scrapers upsert and update rows without setting it,
+-- so Postgres does.
+
+ALTER TABLE grants ADD COLUMN IF NOT EXISTS updated_at timestamp with time zone DEFAULT now();
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS grants_set_updated_at ON grants;
+CREATE TRIGGER grants_set_updated_at
+  BEFORE UPDATE ON grants
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -0,0 +1,84 @@
+"""Helpers shared by the tests: random grants and users for the scorer
+parity tests, signed access tokens, and a settable clock."""
+import json
+import time
+from datetime import date, timedelta
+
+import jwt
+
+from backend.services.scoring_rules import DEFAULT_RULES_PATH, parse_rules
+
+TARGET_GROUPS = ["students", "nonprofits", "founders", "Students", "researchers"]
+LOCATIONS = ["USA", "California", "Canada", "Remote", "usa", "Texas"]
+SECTORS = ["STEM", "arts", "education", "technology", "Engineering", "community", "Biology"]
+CRITERIA = ["female", "BIPOC", "Black", "black", "Latinx", "first-generation", "low-income", "Asian"]
+WORDS = [
+    "students", "research", "stem", "arts", "community", "leadership", "women",
+    "engineering", "software", "first-generation", "undergraduate", "funding",
+    "Biology", "Ärzte", "straße", "party", "ΣΟΦΙΑ",
+]
+INTERESTS = ["arts", "art", "STEM", "software engineering", "Community", "straße", "σοφια", "", "xyz"]
+
+
+def random_deadline(rng):
+    today = date.today()
+    return rng.choice([
+        None,
+        "",
+        "TBD",
+        today.isoformat(),
+        (today - timedelta(days=rng.randint(1, 400))).isoformat(),
+        (today + timedelta(days=rng.randint(1, 400))).isoformat(),
+    ])
+
+
+def random_grant(rng):
+    return {
+        "target_group": rng.sample(TARGET_GROUPS, rng.randint(0, 2)),
+        "location_eligible": rng.sample(LOCATIONS, rng.randint(0, 3)),
+        "sectors": rng.sample(SECTORS, rng.randint(0, 3)),
+        "eligibility_criteria": rng.sample(CRITERIA, rng.randint(0, 3)),
+        "deadline": random_deadline(rng),
+        "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30))),
+    }
+
+
+def random_user(rng):
+    return {
+        "user_type": rng.choice(TARGET_GROUPS),
+        "location": rng.choice(LOCATIONS),
+        "major": rng.choice(SECTORS + ["History"]),
+        "race": rng.choice(CRITERIA + ["LATINX", "White"]),
+        "interests": rng.sample(INTERESTS, rng.randint(0, 3)),
+    }
+
+
+def tuned_rules():
+    """The bundled rules with changed weights, location switched off."""
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    weights = {"target_group": 5, "location": 0, "sectors": 40, "race": 7, "deadline_open": 1, "description": 30}
+    for rule in config["rules"]:
+        rule["weight"] = weights[rule["name"]]
+    return parse_rules(config)
+
+
+SECRET = "super-secret-jwt-token-with-at-least-32-characters"
+
+
+def make_token(key=SECRET, algorithm="HS256", headers=None, **claims):
+    """A signed access token; claims set to None are left out."""
+    payload = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 3600, "email": "a@example.com"}
+    payload.update(claims)
+    payload = {k: v for k, v in payload.items() if v is not None}
+    return jwt.encode(payload, key, algorithm=algorithm, headers=headers)
+
+
+class FakeClock:
+    """A clock that only moves when a test sets `now`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,123 @@
+"""An in-memory stand-in for the Supabase client.
+
+Swap it in with `supabase_factory.override(InMemorySupabase(...))`. It
+covers the PostgREST and GoTrue calls the app makes: table selects with
+eq / in_ / order / limit / range, upsert, insert, update, and the auth
+lookups keyed by access token.
+"""
+from types import SimpleNamespace
+
+
+class Query:
+    def __init__(self, rows, table):
+        self.rows = rows
+        self.table = table
+        self.filters = []
+        self.sort = None
+        self.window = None
+        self.write = None
+
+    def select(self, columns="*", count=None, **_):
+        self.columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        self.count = count
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None):
+        self.sort = (column, desc)
+        return self
+
+    def limit(self, n):
+        self.window = (0, n)
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end - start + 1)
+        return self
+
+    def upsert(self, rows, on_conflict="id", **_):
+        self.write = ("upsert", rows if isinstance(rows, list) else [rows], on_conflict)
+        return self
+
+    def insert(self, rows, **_):
+        self.write = ("insert", rows if isinstance(rows, list) else [rows], None)
+        return self
+
+    def update(self, values, **_):
+        self.write = ("update", values, None)
+        return self
+
+    def _matching(self):
+        return [row for row in self.rows if all(f(row) for f in self.filters)]
+
+    def execute(self):
+        if self.write is not None:
+            return SimpleNamespace(data=self._apply_write())
+        rows = self._matching()
+        total = len(rows) if getattr(self, "count", None) else None
+        if self.sort:
+            column, desc = self.sort
+            present = sorted((r for r in rows if r.get(column) is not None), key=lambda r: r[column], reverse=desc)
+            rows = present + [r for r in rows if r.get(column) is None]
+        if self.window:
+            start, count = self.window
+            rows = rows[start:start + count]
+        if getattr(self, "columns", None):
+            rows = [{c: row.get(c) for c in self.columns} for row in rows]
+        return SimpleNamespace(data=[dict(row) for row in rows], count=total)
+
+    def _apply_write(self):
+        kind, payload, key = self.write
+        if kind == "update":
+            rows = self._matching()
+            for row in rows:
+                row.update(payload)
+            return [dict(row) for row in rows]
+        written = []
+        for new in payload:
+            existing = None
+            if kind == "upsert":
+                keys = [key] if isinstance(key, str) else list(key)
+                existing = next((r for r in self.rows if all(r.get(k) == new.get(k) for k in keys)), None)
+            if existing is not None:
+                existing.update(new)
+                written.append(dict(existing))
+            else:
+                self.rows.append(dict(new))
+                written.append(dict(new))
+        return written
+
+
+class Auth:
+    def __init__(self, users):
+        self.users = users  # access token -> user
+        self.signed_out = []
+        self.admin = SimpleNamespace(sign_out=self.signed_out.append)
+
+    def get_user(self, token):
+        user = self.users.get(token)
+        if user is None:
+            raise ValueError("invalid JWT")
+        return SimpleNamespace(user=user)
+
+
+class InMemorySupabase:
+    """Tables are lists of row dicts; `users` maps access tokens to users."""
+
+    def __init__(self, tables=None, users=None):
+        self.tables = {name: list(rows) for name, rows in (tables or {}).items()}
+        self.auth = Auth(users or {})
+
+    def table(self, name):
+        return Query(self.tables.setdefault(name, []), name)
+
+
+def user(id, email=None):
+    return SimpleNamespace(id=id, email=email)
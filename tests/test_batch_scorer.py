@@ -0,0 +1,33 @@
+import random
+
+from backend.services.batch_scorer import BatchScorer
+from backend.services.score_grant import score_grant
+from factories import random_grant, random_user
+
+
+def test_batch_scores_match_score_grant_on_random_catalogs():
+    """Every component agrees with the per-dict scorer"""
+    rng = random.Random(1234)
+    for _ in range(20):
+        grants = [random_grant(rng) for _ in range(rng.randint(0, 200))]
+        scorer = BatchScorer(grants)
+        for _ in range(10):
+            user = random_user(rng)
+            expected = [score_grant(user, grant) for grant in grants]
+            assert scorer.score(user).tolist() == expected
+
+
+def test_description_matches_do_not_span_grants():
+    """An interest split across two adjacent descriptions is not a hit"""
+    grants = [random_grant(random.Random(0)) for _ in range(2)]
+    grants[0]["description"] = "software"
+    grants[1]["description"] = "engineering"
+    scorer = BatchScorer(grants)
+    assert not scorer.mentions(["software engineering"]).any()
+    assert scorer.mentions(["ENGINEERING"]).tolist() == [False, True]
+
+
+def test_empty_catalog():
+    """An empty catalog scores to an empty array"""
+    user = random_user(random.Random(0))
+    assert BatchScorer([]).score(user).tolist() == []
@@ -0,0 +1,54 @@
+import json
+import random
+
+from backend.services.bulk_match import match_profiles, match_profiles_sharded, profile_to_user, to_ndjson
+from backend.services.grant_catalog import CatalogSnapshot
+from backend.services.match_engine import rank_matches
+from factories import random_grant, random_user
+
+
+def make_snapshot(n=300, seed=5):
+    rng = random.Random(seed)
+    grants = [dict(random_grant(rng), id=f"grant-{i}", title=f"Grant {i}") for i in range(n)]
+    return CatalogSnapshot(grants, None, 0)
+
+
+def test_bulk_results_match_single_requests():
+    """Pool workers return the same matches as one /match-grants call per user"""
+    snapshot = make_snapshot()
+    rng = random.Random(9)
+    profiles = [(f"user-{i}", random_user(rng)) for i in range(150)]
+    for workers in (1, 2):
+        results = list(match_profiles(snapshot, profiles, limit=10, workers=workers))
+        assert [r["profile_id"] for r in results] == [pid for pid, _ in profiles]
+        for (_, user), result in zip(profiles, results):
+            page, _ = rank_matches(snapshot, user, 10)
+            assert [(g["score"], g["id"]) for g in result["grants"]] == [(s, gid) for s, gid, _ in page]
+
+
+def test_ndjson_lines():
+    """Each result is one JSON document per line"""
+    lines = list(to_ndjson([{"profile_id": "a", "grants": []}, {"profile_id": "b", "grants": []}]))
+    assert [json.loads(line)["profile_id"] for line in lines] == ["a", "b"]
+    assert all(line.endswith("\n") for line in lines)
+
+
+def test_profile_to_user_defaults():
+    """Stored profiles without matching fields still produce a scorable user"""
+    user = profile_to_user({"id": "u1", "major": "Biology", "state": "California", "interests": None})
+    assert user == {
+        "user_type": "students",
+        "location": "California",
+        "major": "Biology",
+        "race": "",
+        "interests": [],
+    }
+
+
+def test_sharded_bulk_results_match_single_requests():
+    """Splitting grants across workers gives the same results as splitting profiles"""
+    snapshot = make_snapshot()
+    rng = random.Random(10)
+    profiles = [(f"user-{i}", random_user(rng)) for i in range(60)]
+    expected = list(match_profiles(snapshot, profiles, limit=10))
+    assert list(match_profiles_sharded(snapshot, profiles, limit=10, workers=2)) == expected
@@ -0,0 +1,70 @@
+import pickle
+import random
+
+from backend.services import compact_grant
+from backend.services.compact_grant import TAGS, CompactGrant, compact_grants
+from backend.services.grant_catalog import CatalogSnapshot, GrantCatalog
+from backend.services.match_engine import rank_matches
+from factories import random_grant, random_user
+
+
+def make_rows(n=200, seed=3):
+    rng = random.Random(seed)
+    return [dict(random_grant(rng), id=f"grant-{i}", title=f"Grant {i}", amount="$1,000") for i in range(n)]
+
+
+def test_reads_back_the_source_row():
+    """A compact record equals the dict row it was built from"""
+    for row in make_rows():
+        grant = CompactGrant(row)
+        assert dict(grant) == row
+        assert grant.get("sectors") == row["sectors"]
+        assert grant.get("source_url", "none") == "none"
+
+
+def test_nulls_and_unknown_columns():
+    """NULL columns stay None, absent columns stay absent, extra columns survive"""
+    row = {"id": "g1", "title": "T", "description": None, "sectors": None, "rank": 3}
+    grant = CompactGrant(row)
+    assert dict(grant) == row
+    assert "deadline" not in grant
+
+
+def test_membership_does_not_decompress(monkeypatch):
+    """`in` checks columns without reading the description"""
+    grant = CompactGrant({"id": "g1", "description": "Long text", "sectors": None})
+    monkeypatch.setattr(compact_grant.zlib, "decompress", None)
+    assert "description" in grant and "sectors" in grant and "id" in grant
+    assert "deadline" not in grant and "rank" not in grant
+
+
+def test_tags_are_shared():
+    """Rows with the same tags share one tuple of vocabulary ids"""
+    a = CompactGrant({"id": "a", "sectors": ["STEM", "arts"]})
+    b = CompactGrant({"id": "b", "sectors": ["STEM", "arts"]})
+    assert a._tags[2] is b._tags[2]
+    assert [TAGS.tags[i] for i in a._tags[2]] == ["STEM", "arts"]
+
+
+def test_pickles_as_a_row():
+    """Records survive pickling to pool workers, whatever their vocabulary"""
+    row = make_rows(1)[0]
+    assert dict(pickle.loads(pickle.dumps(CompactGrant(row)))) == row
+
+
+def test_ranking_is_unchanged():
+    """Matches over compact rows equal matches over dict rows"""
+    rows = make_rows()
+    plain = CatalogSnapshot(rows, None, 0)
+    compact = GrantCatalog(lambda: rows, compact=True).snapshot()
+    assert isinstance(compact.grants[0], CompactGrant)
+    rng = random.Random(6)
+    for _ in range(30):
+        user = random_user(rng)
+        assert rank_matches(compact, user, 10) == rank_matches(plain, user, 10)
+
+
+def test_compact_grants_keeps_order():
+    """Records come back in row order"""
+    rows = make_rows(20)
+    assert [g["id"] for g in compact_grants(rows)] == [r["id"] for r in rows]
@@ -0,0 +1,42 @@
+import random
+from datetime import date
+
+from backend.services.deadline_index import DeadlineIndex
+from backend.services.grant_catalog import CatalogSnapshot
+from backend.services.match_engine import score_candidates
+from backend.services.normalized_grant import normalize_grant, prepare_user
+from factories import random_grant, random_user
+
+
+def test_cutoff_matches_a_linear_scan():
+    """The bisect cutoff agrees with comparing every deadline"""
+    rng = random.Random(3)
+    grants = [normalize_grant(random_grant(rng)) for _ in range(300)]
+    index = DeadlineIndex(grants)
+    for today in [date.today(), date(2000, 1, 1), date(2100, 1, 1)]:
+        expected = {row_id for row_id, g in enumerate(grants) if g.open_until >= today}
+        cutoff = index.cutoff(today)
+        assert {row_id for row_id in range(len(grants)) if index.is_open(row_id, cutoff)} == expected
+
+
+def test_missing_and_invalid_deadlines():
+    """No deadline is always open, an unparseable one never is"""
+    grants = [normalize_grant({"deadline": d}) for d in [None, "TBD", "2025-01-01"]]
+    index = DeadlineIndex(grants)
+    for today, expected in [(date(2024, 12, 31), [True, False, True]), (date(2025, 1, 2), [True, False, False])]:
+        cutoff = index.cutoff(today)
+        assert [index.is_open(row_id, cutoff) for row_id in range(3)] == expected
+
+
+def test_include_expired_false_drops_past_deadlines():
+    """Only open grants are scored when expired ones are excluded"""
+    rng = random.Random(4)
+    grants = [dict(random_grant(rng), id=f"g{i}") for i in range(300)]
+    snapshot = CatalogSnapshot(grants, None, 0)
+    normalized = [normalize_grant(g) for g in grants]
+    today = date.today()
+    for _ in range(20):
+        query = prepare_user(random_user(rng))
+        everything = list(score_candidates(snapshot, query, today))
+        open_only = list(score_candidates(snapshot, query, today, include_expired=False))
+        assert open_only == [e for e in everything if normalized[e[2]].open_until >= today]
@@ -0,0 +1,71 @@
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend import dependencies
+from backend.routers import match_grants
+from backend.services.token_cache import TokenCache
+from backend.services.token_verifier import TokenVerifier
+from factories import SECRET, make_token
+
+
+
+def counting_verifier(monkeypatch):
+    verifier = TokenVerifier(secret=SECRET)
+    calls = []
+    user = verifier.user
+    monkeypatch.setattr(verifier, "user", lambda token: calls.append(token) or user(token))
+    monkeypatch.setattr(dependencies, "token_verifier", verifier)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache())
+    return calls
+
+
+def test_current_user_is_resolved_once_per_request(monkeypatch):
+    """Every dependency asking for the user in one request shares one lookup"""
+    calls = counting_verifier(monkeypatch)
+    lookups = []
+    monkeypatch.setattr(dependencies, "get_user_from_token", lambda token: lookups.append(token) or
+                        dependencies.token_verifier.user(token))
+
+    def user_id(user=Depends(dependencies.current_user, use_cache=False)):
+        return user.id
+
+    app = FastAPI()
+
+    @app.get("/whoami")
+    def whoami(request: Request, user=Depends(dependencies.current_user), again: str = Depends(user_id)):
+        return {"id": user.id, "again": again, "state": request.state.user.id}
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    assert client.get("/whoami", headers=headers).json() == {"id": "user-1", "again": "user-1", "state": "user-1"}
+    assert len(lookups) == 1
+    client.get("/whoami", headers=headers)
+    assert len(lookups) == 2  # memoized per request, not across requests
+    assert len(calls) == 2
+
+
+def test_requests_share_the_token_cache(monkeypatch):
+    """Across requests a token is verified once, through the token cache"""
+    calls = counting_verifier(monkeypatch)
+    app = FastAPI()
+
+    @app.get("/whoami")
+    def whoami(user=Depends(dependencies.current_user)):
+        return {"id": user.id}
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    for _ in range(3):
+        assert client.get("/whoami", headers=headers).json() == {"id": "user-1"}
+    assert len(calls) == 1
+
+
+def test_bulk_matching_requires_a_user(monkeypatch):
+    """/match-grants/bulk is refused without a valid bearer token"""
+    counting_verifier(monkeypatch)
+    app = FastAPI()
+    app.include_router(match_grants.router)
+    client = TestClient(app)
+    assert client.post("/match-grants/bulk", json={"profiles": {}}).status_code in (401, 403)
+    response = client.post("/match-grants/bulk", json={"profiles": {}}, headers={"Authorization": "Bearer nope"})
+    assert response.status_code == 401
@@ -0,0 +1,29 @@
+import random
+
+from backend.services.description_index import DescriptionIndex
+from backend.services.normalized_grant import normalize_grant
+from factories import random_grant
+
+INTERESTS = [
+    "art", "arts", "party", "software engineering", "first-gen", "first-generation",
+    "σοφια", "straße", "ng sof", " research", "++", "", "zzz", "stem,",
+]
+
+
+def test_mentions_match_substring_scan():
+    """Index lookups find exactly the rows a substring scan would"""
+    rng = random.Random(7)
+    grants = [normalize_grant(random_grant(rng)) for _ in range(400)]
+    index = DescriptionIndex(grants)
+    for interest in INTERESTS:
+        expected = {row_id for row_id, g in enumerate(grants) if interest in g.description}
+        assert index.rows_mentioning(interest) == expected, interest
+
+
+def test_mentions_unions_interests():
+    """mentions() is the union over all interests"""
+    grants = [normalize_grant({"description": d}) for d in ["Arts and crafts", "A party", "Robotics"]]
+    index = DescriptionIndex(grants)
+    assert index.mentions(["art"]) == {0, 1}
+    assert index.mentions(["robot", "crafts"]) == {0, 2}
+    assert index.mentions([]) == set()
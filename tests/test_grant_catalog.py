@@ -0,0 +1,87 @@
+from backend.services.grant_catalog import GrantCatalog
+from factories import FakeClock
+
+
+class FakeTable:
+    def __init__(self, grants):
+        self.grants = grants
+        self.loads = 0
+        self.version_checks = 0
+
+    def fetch_grants(self):
+        self.loads += 1
+        return list(self.grants)
+
+    def fetch_version(self):
+        self.version_checks += 1
+        return max(g["updated_at"] for g in self.grants), len(self.grants)
+
+
+def make_catalog(ttl=60):
+    table = FakeTable([{"id": "a", "updated_at": "2025-01-01T00:00:00+00:00"}])
+    clock = FakeClock()
+    return table, clock, GrantCatalog(table.fetch_grants, table.fetch_version, ttl=ttl, clock=clock)
+
+
+def test_catalog_loads_once_within_ttl():
+    """Repeated reads inside the TTL never hit the table"""
+    table, clock, catalog = make_catalog()
+    catalog.grants()
+    clock.now = 30
+    catalog.grants()
+    assert table.loads == 1
+    assert table.version_checks == 0
+
+
+def test_catalog_keeps_snapshot_when_version_unchanged():
+    """After the TTL only the version is probed if nothing changed"""
+    table, clock, catalog = make_catalog()
+    first = catalog.snapshot()
+    clock.now = 61
+    assert catalog.snapshot() is first
+    assert table.loads == 1
+    assert table.version_checks == 1
+
+
+def test_catalog_reloads_when_version_changes():
+    """A newer updated_at triggers a full reload"""
+    table, clock, catalog = make_catalog()
+    catalog.grants()
+    table.grants.append({"id": "b", "updated_at": "2025-02-01T00:00:00+00:00"})
+    clock.now = 61
+    snapshot = catalog.snapshot()
+    assert [g["id"] for g in snapshot.grants] == ["a", "b"]
+    assert snapshot.version == ("2025-02-01T00:00:00+00:00", 2)
+    assert table.loads == 2
+
+
+def test_catalog_reloads_when_a_grant_is_deleted():
+    """A delete leaves max(updated_at) alone but changes the row count"""
+    table, clock, catalog = make_catalog()
+    table.grants.insert(0, {"id": "old", "updated_at": "2024-01-01T00:00:00+00:00"})
+    clock.now = 61
+    assert len(catalog.grants()) == 2
+    del table.grants[0]
+    clock.now = 122
+    assert [g["id"] for g in catalog.grants()] == ["a"]
+    assert table.loads == 2
+
+
+def test_catalog_invalidate_forces_reload():
+    """invalidate() reloads even when the version is the same"""
+    table, clock, catalog = make_catalog()
+    catalog.grants()
+    catalog.invalidate()
+    catalog.grants()
+    assert table.loads == 2
+
+
+def test_router_version_probe_counts_rows():
+    """fetch_grants_version reports max(updated_at) and the row count"""
+    from backend.routers import match_grants
+    from backend.services.supabase_client import supabase_factory
+    from fake_supabase import InMemorySupabase
+
+    rows = [{"id": "a", "updated_at": "2025-01-01"}, {"id": "b", "updated_at": "2025-03-01"}]
+    with supabase_factory.override(InMemorySupabase({"grants": rows})):
+        assert match_grants.fetch_grants_version() == ("2025-03-01", 2)
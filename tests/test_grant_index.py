@@ -0,0 +1,90 @@
+from backend.services.grant_index import EligibilityIndex
+from backend.services.normalized_grant import normalize_grant, prepare_user
+from backend.services.score_grant import score_grant
+
+GRANTS = [
+    {
+        "title": "Women in STEM Fellowship",
+        "description": "A fellowship for female-identifying undergraduate students in STEM majors.",
+        "deadline": None,
+        "location_eligible": ["USA"],
+        "target_group": ["students"],
+        "sectors": ["STEM", "Engineering"],
+        "eligibility_criteria": ["female", "undergraduate", "STEM"],
+    },
+    {
+        "title": "California Arts Recovery Grant",
+        "description": "Grant for small arts nonprofits in California affected by the pandemic.",
+        "deadline": None,
+        "location_eligible": ["California"],
+        "target_group": ["nonprofits"],
+        "sectors": ["arts", "community"],
+        "eligibility_criteria": ["COVID-19", "arts"],
+    },
+    {
+        "title": "Black Tech Builders Grant",
+        "description": "Support for Black-identifying entrepreneurs working on software products.",
+        "deadline": None,
+        "location_eligible": ["Canada"],
+        "target_group": ["founders"],
+        "sectors": ["technology", "software"],
+        "eligibility_criteria": ["Black", "entrepreneurship"],
+    },
+    {
+        "title": "Disabled Founders Fund",
+        "description": "Grant supporting disabled entrepreneurs launching inclusive products.",
+        "deadline": None,
+        "location_eligible": ["Remote"],
+        "target_group": ["founders"],
+        "sectors": ["accessibility"],
+        "eligibility_criteria": ["disabled"],
+    },
+]
+
+
+def make_index():
+    return EligibilityIndex([normalize_grant(grant) for grant in GRANTS])
+
+
+def candidates(index, user):
+    return index.candidates(prepare_user(user))
+
+
+def make_user(**overrides):
+    user = {
+        "user_type": "students",
+        "location": "Texas",
+        "major": "Biology",
+        "race": "Asian",
+        "interests": [],
+    }
+    user.update(overrides)
+    return user
+
+
+def test_candidates_match_on_each_column():
+    """Each array column contributes its postings"""
+    index = make_index()
+    assert candidates(index, make_user()) == {0}
+    assert candidates(index, make_user(user_type="x", location="California")) == {1}
+    assert candidates(index, make_user(user_type="x", major="software")) == {2}
+    assert candidates(index, make_user(user_type="x", interests=["arts"])) == {1}
+    assert candidates(index, make_user(user_type="x", race="BLACK")) == {2}
+
+
+def test_candidates_include_description_only_matches():
+    """Grants that only mention an interest in the description are kept"""
+    index = make_index()
+    assert candidates(index, make_user(user_type="x", interests=["Inclusive"])) == {3}
+
+
+def test_non_candidates_only_score_the_deadline_bonus():
+    """Pruned grants could never have scored more than the open-deadline bonus"""
+    index = make_index()
+    user = make_user(interests=["software", "pandemic"])
+    found = candidates(index, user)
+    for row_id, grant in enumerate(GRANTS):
+        if row_id not in found:
+            assert score_grant(user, grant) == 10
+        else:
+            assert score_grant(user, grant) > 10
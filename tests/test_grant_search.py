@@ -0,0 +1,130 @@
+import math
+import random
+
+from backend.services.grant_catalog import CatalogSnapshot, GrantCatalog
+from backend.services.grant_search import GrantSearch, SearchIndex, tokenize
+
+GRANTS = [
+    {"id": "stem", "title": "Women in STEM Fellowship",
+     "description": "A fellowship for female undergraduate students in STEM majors.",
+     "sectors": ["STEM"], "location_eligible": ["USA"]},
+    {"id": "arts", "title": "California Arts Recovery Grant",
+     "description": "Grant for small arts nonprofits in California.",
+     "sectors": ["arts"], "location_eligible": ["California"]},
+    {"id": "tech", "title": "Black Tech Builders Grant",
+     "description": "Support for entrepreneurs working on software products in STEM.",
+     "sectors": ["technology"], "location_eligible": ["USA"]},
+]
+
+
+def reference_bm25(grants, text, k1=1.2, b=0.75):
+    """Straightforward BM25 over title + description, for comparison"""
+    docs = {g["id"]: tokenize(g["title"]) + tokenize(g["description"]) for g in grants}
+    average = sum(len(d) for d in docs.values()) / len(docs)
+    scores = {}
+    for grant_id, doc in docs.items():
+        score = 0.0
+        for term in set(tokenize(text)):
+            df = sum(term in d for d in docs.values())
+            if not df:
+                continue
+            tf = doc.count(term)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / average))
+        if score > 0:
+            scores[grant_id] = score
+    return scores
+
+
+def test_scores_match_reference_bm25():
+    """Vectorized scoring equals the textbook formula"""
+    index = SearchIndex()
+    for grant in GRANTS:
+        index.add(grant)
+    for query in ["stem", "grant california", "software STEM students", "nothing"]:
+        expected = reference_bm25(GRANTS, query)
+        hits = index.search(query, limit=10)
+        assert {grant_id for _, grant_id in hits} == set(expected)
+        for score, grant_id in hits:
+            assert math.isclose(score, expected[grant_id])
+        assert [s for s, _ in hits] == sorted((s for s, _ in hits), reverse=True)
+
+
+def test_filters_on_array_columns():
+    """Every filtered column must share a tag with the grant"""
+    index = SearchIndex()
+    for grant in GRANTS:
+        index.add(grant)
+    assert [g for _, g in index.search("stem", filters={"location_eligible": ["USA"]})] == ["stem", "tech"]
+    assert [g for _, g in index.search("stem", filters={"sectors": ["technology"]})] == ["tech"]
+    assert index.search("stem", filters={"sectors": ["arts"]}) == []
+
+
+def test_incremental_updates_match_a_rebuild():
+    """Adding, replacing and removing grants gives the same results as indexing from scratch"""
+    rng = random.Random(2)
+    words = "arts stem women research community software grant scholarship students".split()
+    grants = {
+        f"g{i}": {"id": f"g{i}", "title": rng.choice(words), "description": " ".join(rng.choices(words, k=12))}
+        for i in range(60)
+    }
+    index = SearchIndex()
+    for grant in grants.values():
+        index.add(grant)
+    for i in range(0, 60, 3):
+        grants[f"g{i}"] = dict(grants[f"g{i}"], description=" ".join(rng.choices(words, k=5)))
+        index.add(grants[f"g{i}"])
+    for i in range(1, 60, 5):
+        index.remove(f"g{i}")
+        del grants[f"g{i}"]
+    fresh = SearchIndex()
+    for grant in grants.values():
+        fresh.add(grant)
+    assert len(index) == len(fresh)
+    for query in ["arts", "stem women", "community research software"]:
+        assert index.search(query, limit=100) == fresh.search(query, limit=100)
+
+
+def test_updates_reuse_slots():
+    """Re-adding grants over and over keeps one slot per indexed grant"""
+    index = SearchIndex()
+    for version in range(50):
+        for i in range(100):
+            index.add({"id": f"g{i}", "title": f"grant v{version}", "description": "community arts"})
+    index.remove("g0")
+    index.add({"id": "g100", "title": "new grant", "description": "arts"})
+    assert len(index._grant_ids) == 100
+    assert len(index.search("arts", limit=200)) == 100
+
+
+def test_grant_search_follows_catalog_changes():
+    """Only changed rows are re-indexed when the catalog moves"""
+    rows = [dict(g, updated_at="1") for g in GRANTS]
+    search = GrantSearch(GrantCatalog(lambda: [dict(r) for r in rows], ttl=0))
+    search.snapshot()
+    rows[1] = dict(rows[1], description="Now about robotics", updated_at="2")
+    del rows[0]
+    search.snapshot()
+    assert [g for _, g in search.index.search("robotics")] == ["arts"]
+    assert [g for _, g in search.index.search("women")] == []
+
+
+class SnapshotSequence:
+    """A catalog whose snapshot() returns the given snapshots in turn."""
+
+    def __init__(self, snapshots):
+        self._snapshots = iter(snapshots)
+
+    def snapshot(self):
+        return next(self._snapshots)
+
+
+def test_grant_search_never_moves_back():
+    """A snapshot older than the indexed one does not roll the index back"""
+    old = CatalogSnapshot([dict(g, updated_at="1") for g in GRANTS], ("1", 3), loaded_at=1.0)
+    new = CatalogSnapshot([dict(GRANTS[1], description="Now about robotics", updated_at="2")], ("2", 1), loaded_at=2.0)
+    search = GrantSearch(SnapshotSequence([new, old]))
+    search.snapshot()
+    assert search.snapshot() is new
+    assert [g for _, g in search.index.search("robotics")] == ["arts"]
+    assert [g for _, g in search.index.search("women")] == []
@@ -0,0 +1,74 @@
+from datetime import date
+
+from backend.services.grant_catalog import CatalogSnapshot
+from backend.services.match_cache import MatchCache, profile_key
+from backend.services import match_engine
+from backend.services.match_engine import rank_matches, scored_entries
+from factories import FakeClock
+
+USER = {"user_type": "students", "location": "USA", "major": "STEM", "race": "", "interests": ["arts", "stem"]}
+GRANTS = [
+    {"id": f"g{i}", "description": "arts", "deadline": None, "target_group": ["students"],
+     "location_eligible": [], "sectors": [], "eligibility_criteria": []}
+    for i in range(5)
+]
+
+
+def test_profile_key_is_canonical():
+    """Field order does not change the key; profile, version and day do"""
+    snapshot = CatalogSnapshot([], "v1", 1.0)
+    today = date(2025, 1, 1)
+    reordered = dict(reversed(list(USER.items())))
+    assert profile_key(USER, snapshot, today) == profile_key(reordered, snapshot, today)
+    assert profile_key(USER, snapshot, today) != profile_key({**USER, "major": "Art"}, snapshot, today)
+    assert profile_key(USER, snapshot, today) != profile_key(USER, CatalogSnapshot([], "v2", 1.0), today)
+    assert profile_key(USER, snapshot, today) != profile_key(USER, snapshot, date(2025, 1, 2))
+
+
+def test_lru_eviction_and_counters():
+    """The least recently used entry is evicted first"""
+    cache = MatchCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are misses"""
+    clock = FakeClock()
+    cache = MatchCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+
+
+def test_rank_matches_reuses_cached_scores():
+    """The second page comes from the cache and matches an uncached ranking"""
+    snapshot = CatalogSnapshot(GRANTS, "v1", 1.0)
+    cache = MatchCache()
+    first, cursor = rank_matches(snapshot, USER, 2, cache=cache)
+    second, _ = rank_matches(snapshot, USER, 2, after=(first[-1][0], first[-1][1]), cache=cache)
+    assert cache.stats()["hits"] == 1
+    uncached, _ = rank_matches(snapshot, USER, 4)
+    assert first + second == uncached
+
+
+def test_cache_keeps_only_the_first_pages(monkeypatch):
+    """Entries hold CACHE_DEPTH matches; pages past them are scored again"""
+    monkeypatch.setattr(match_engine, "CACHE_DEPTH", 3)
+    snapshot = CatalogSnapshot(GRANTS, "v1", 1.0)
+    cache = MatchCache()
+    first, cursor = rank_matches(snapshot, USER, 2, cache=cache)
+    top, complete = cache.get(match_engine.cache_key(USER, snapshot, date.today(), True, False))
+    assert len(top) == 3 and not complete
+    second, _ = rank_matches(snapshot, USER, 2, after=(first[-1][0], first[-1][1]), cache=cache)
+    third, _ = rank_matches(snapshot, USER, 2, after=(second[-1][0], second[-1][1]), cache=cache)
+    uncached, _ = rank_matches(snapshot, USER, 5)
+    assert first + second + third == uncached
+    assert sorted(scored_entries(snapshot, USER, cache=cache)) == sorted(uncached)
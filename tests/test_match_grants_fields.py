@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routers import grants as grants_router
+from backend.routers import match_grants as router
+from backend.services.grant_catalog import GrantCatalog
+
+GRANTS = [
+    {
+        "id": "g1", "title": "Women in STEM Fellowship", "description": "For students in STEM majors.",
+        "amount": "$5,000", "deadline": None, "location_eligible": ["USA"], "target_group": ["students"],
+        "sectors": ["STEM"], "eligibility_criteria": ["female"], "source_url": "https://example.com/g1",
+        "created_at": "2025-01-01T00:00:00+00:00", "updated_at": "2025-01-01T00:00:00+00:00",
+    },
+]
+USER = {"user_type": "students", "location": "USA", "major": "STEM", "race": "", "interests": []}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    catalog = GrantCatalog(lambda: GRANTS, compact=True)
+    monkeypatch.setattr(router, "grant_catalog", catalog)
+    monkeypatch.setattr(router, "match_cache", None)
+    monkeypatch.setattr(grants_router, "grant_catalog", catalog)
+    app = FastAPI()
+    app.include_router(router.router)
+    app.include_router(grants_router.router)
+    return TestClient(app)
+
+
+def test_default_response_leaves_out_descriptions(client):
+    """Matches carry the list view's columns and no description"""
+    grant = client.post("/match-grants", json=USER).json()["grants"][0]
+    assert set(grant) == {*router.DEFAULT_MATCH_FIELDS, "score"}
+    assert grant["score"] == 80
+
+
+def test_fields_projection(client):
+    """?fields= picks columns; the id and score are always included"""
+    grant = client.post("/match-grants?fields=title,description", json=USER).json()["grants"][0]
+    assert grant == {"id": "g1", "title": GRANTS[0]["title"], "description": GRANTS[0]["description"], "score": 80}
+    full = client.post("/match-grants?fields=*", json=USER).json()["grants"][0]
+    assert full == {**GRANTS[0], "score": 80}
+
+
+def test_unknown_field_is_rejected(client):
+    """Unknown columns are a 400, not silently dropped"""
+    response = client.post("/match-grants?fields=title,secret", json=USER)
+    assert response.status_code == 400
+
+
+def test_grant_detail(client):
+    """GET /grants/{id} returns the full row"""
+    assert client.get("/grants/g1").json() == GRANTS[0]
+    assert client.get("/grants/missing").status_code == 404
+
+
+def test_ndjson_stream(client, monkeypatch):
+    """Accept: application/x-ndjson streams every match, one per line, in rank order"""
+    grants = [dict(GRANTS[0], id=f"g{i}", sectors=["STEM"] if i % 2 else []) for i in range(30)]
+    catalog = GrantCatalog(lambda: grants)
+    monkeypatch.setattr(router, "grant_catalog", catalog)
+    response = client.post("/match-grants?fields=title", json=USER, headers={"Accept": "application/x-ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 30
+    ranked = [(g["score"], g["id"]) for g in lines]
+    assert ranked == sorted(ranked, key=lambda e: (-e[0], e[1]))
+    assert set(lines[0]) == {"id", "title", "score"}
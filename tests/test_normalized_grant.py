@@ -0,0 +1,34 @@
+import random
+from datetime import date
+
+from backend.services.normalized_grant import normalize_grant, parse_deadline, prepare_user
+from backend.services.score_grant import score_grant, score_normalized_grant
+from factories import random_grant, random_user
+
+
+def test_normalized_scores_match_score_grant():
+    """Scoring the normalized form gives the same result as the raw dict"""
+    rng = random.Random(42)
+    grants = [random_grant(rng) for _ in range(300)]
+    normalized = [normalize_grant(grant) for grant in grants]
+    today = date.today()
+    for _ in range(50):
+        user = random_user(rng)
+        query = prepare_user(user)
+        for grant, prepared in zip(grants, normalized):
+            assert score_normalized_grant(query, prepared, today) == score_grant(user, grant)
+
+
+def test_parse_deadline_open_until():
+    """Missing deadlines stay open forever, unparseable ones never open"""
+    assert parse_deadline(None) == (None, date.max)
+    assert parse_deadline("") == (None, date.max)
+    assert parse_deadline("TBD") == (None, date.min)
+    assert parse_deadline("2025-08-31") == (date(2025, 8, 31), date(2025, 8, 31))
+
+
+def test_normalize_grant_lowercases():
+    """Descriptions and eligibility criteria are lowercased once"""
+    grant = normalize_grant({"description": "Women in STEM, first-generation!", "eligibility_criteria": ["BIPOC"]})
+    assert grant.description == "women in stem, first-generation!"
+    assert grant.eligibility_criteria == {"bipoc"}
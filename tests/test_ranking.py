@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from backend.services.ranking import decode_cursor, encode_cursor, iter_ranked, paginate, top_k
+
+
+def make_scored(n, seed=0):
+    rng = random.Random(seed)
+    return [(rng.choice([10, 25, 45, 70, 100]), f"grant-{i:04d}", i) for i in range(n)]
+
+
+def test_top_k_matches_full_sort():
+    """Heap selection returns the same prefix as sorting everything"""
+    scored = make_scored(500)
+    expected = sorted(scored, key=lambda e: (-e[0], e[1]))[:20]
+    assert top_k(iter(scored), 20) == expected
+
+
+def test_pages_walk_the_full_ranking_once():
+    """Following next_cursor visits every entry exactly once, in rank order"""
+    scored = make_scored(95)
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate(iter(scored), 20, decode_cursor(cursor) if cursor else None)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == sorted(scored, key=lambda e: (-e[0], e[1]))
+
+
+def test_cursor_round_trip_and_validation():
+    """Cursors encode (score, id) and reject garbage"""
+    assert decode_cursor(encode_cursor(45, "abc-123")) == (45, "abc-123")
+    for bad in ["", "45", "x:abc", "45:"]:
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_iter_ranked_matches_paginate():
+    """Streaming every entry gives the same order as paging through them"""
+    rng = random.Random(3)
+    entries = [(rng.randint(0, 5), f"g{i:03d}", i) for i in range(200)]
+    streamed = list(iter_ranked(entries))
+    assert streamed == sorted(entries, key=lambda e: (-e[0], e[1]))
+    after = (streamed[49][0], streamed[49][1])
+    assert list(iter_ranked(entries, after)) == streamed[50:]
@@ -0,0 +1,75 @@
+import random
+from datetime import date
+
+import pytest
+
+from backend.services.batch_scorer import BatchScorer
+from backend.services.normalized_grant import normalize_grant, prepare_user
+from backend.services.score_grant import score_grant
+from backend.services.scoring_rules import (
+    DEFAULT_RULES_PATH,
+    compile_normalized_scorer,
+    load_rules,
+    parse_rules,
+)
+from factories import random_grant, random_user, tuned_rules
+
+
+def test_default_rules_reproduce_score_grant():
+    """Every compiled form of the bundled rules scores exactly like score_grant"""
+    rules = load_rules(DEFAULT_RULES_PATH)
+    normalized_scorer = compile_normalized_scorer(rules)
+    rng = random.Random(20)
+    grants = [random_grant(rng) for _ in range(300)]
+    normalized = [normalize_grant(grant) for grant in grants]
+    batch = BatchScorer(grants, rules)
+    today = date.today()
+    for _ in range(40):
+        user = random_user(rng)
+        query = prepare_user(user)
+        expected = [score_grant(user, grant) for grant in grants]
+        assert [normalized_scorer(query, grant, today) for grant in normalized] == expected
+        assert batch.score(user).tolist() == expected
+
+
+def test_tuned_weights_agree_across_scorers():
+    """Changed weights apply the same way to normalized grants and arrays"""
+    rules = tuned_rules()
+    normalized_scorer = compile_normalized_scorer(rules)
+    rng = random.Random(21)
+    grants = [random_grant(rng) for _ in range(200)]
+    batch = BatchScorer(grants, rules)
+    today = date.today()
+    for _ in range(30):
+        user = random_user(rng)
+        query = prepare_user(user)
+        expected = batch.score(user).tolist()
+        assert [normalized_scorer(query, normalize_grant(grant), today) for grant in grants] == expected
+    assert "location" not in normalized_scorer.source
+
+
+def test_generic_rules_in_batch_scorer():
+    """Rules the match index cannot serve still compile for arrays"""
+    rules = parse_rules({"rules": [
+        {"name": "groups", "match": "contains", "user": ["user_type", "interests"], "grant": "target_group",
+         "weight": 9, "casefold": True},
+    ]})
+    grants = [{"target_group": ["Students"], "deadline": None, "description": ""}, {"target_group": ["ARTS"]}]
+    user = {"user_type": "students", "location": "", "major": "", "race": "", "interests": ["arts"]}
+    assert BatchScorer(grants, rules).score(user).tolist() == [9, 9]
+    with pytest.raises(ValueError):
+        compile_normalized_scorer(rules)
+
+
+@pytest.mark.parametrize("rule", [
+    {"match": "regex", "user": ["major"], "grant": "sectors", "weight": 1},
+    {"match": "contains", "user": ["gpa"], "grant": "sectors", "weight": 1},
+    {"match": "contains", "user": ["major"], "grant": "title", "weight": 1},
+    {"match": "contains", "user": ["major"], "grant": "sectors", "weight": 1.5},
+    {"match": "substring", "user": ["interests"], "grant": "description", "weight": 1},
+    {"match": "open_deadline", "user": ["major"], "grant": "deadline", "weight": 1},
+])
+def test_invalid_rules_are_rejected(rule):
+    """Malformed rules fail when the file is loaded, not while scoring"""
+    with pytest.raises(ValueError):
+        parse_rules({"rules": [rule]})
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(code):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SUPABASE_")}
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.split()
+
+
+def test_importing_main_builds_nothing():
+    """import main loads neither FastAPI nor the routers"""
+    assert run("import main, sys; print('fastapi' in sys.modules, 'backend.routers.profile' in sys.modules)") == [
+        "False", "False",
+    ]
+
+
+def test_app_starts_without_credentials_or_clients():
+    """main:app builds without Supabase credentials and opens no clients"""
+    code = (
+        "import sys; from main import app; "
+        "print(len(app.routes) > 1, *(m in sys.modules for m in ('supabase', 'httpx', 'playwright', 'bs4')))"
+    )
+    assert run(code) == ["True", "False", "False", "False", "False"]
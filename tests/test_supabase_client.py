@@ -0,0 +1,67 @@
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import dependencies
+from backend.routers import profile
+from backend.services.supabase_client import SupabaseFactory, supabase_factory
+from backend.services.token_cache import TokenCache
+from fake_supabase import InMemorySupabase, user
+
+
+def recording_factory(seen):
+    def handler(request):
+        seen.append((request.url.path, request.headers.get("authorization")))
+        return httpx.Response(200, json=[{"id": 1}])
+
+    factory = SupabaseFactory("http://localhost:54321", "anon-key", max_connections=4)
+    factory._http = httpx.Client(transport=httpx.MockTransport(handler))
+    return factory
+
+
+def test_clients_share_one_connection_pool():
+    """The shared client and session clients all send through one httpx pool"""
+    seen = []
+    factory = recording_factory(seen)
+    assert factory.client() is factory.client()
+    session = factory.session_client()
+    assert session is not factory.client()
+    factory.client().table("grants").select("*").execute()
+    session.table("profiles").select("*").execute()
+    assert [path for path, _ in seen] == ["/rest/v1/grants", "/rest/v1/profiles"]
+    assert {auth for _, auth in seen} == {"Bearer anon-key"}
+    assert factory.client().postgrest.session is session.postgrest.session is factory.http()
+
+
+def test_pool_settings_come_from_the_environment():
+    """SUPABASE_* variables tune the pool; nothing connects until first use"""
+    factory = SupabaseFactory.from_env({"SUPABASE_MAX_CONNECTIONS": "50", "SUPABASE_TIMEOUT": "3"})
+    assert factory.max_connections == 50
+    assert factory._http is None and factory._client is None
+    assert factory.http().timeout.read == 3
+
+
+def test_close_opens_a_new_pool_on_next_use():
+    """After close the next client gets a fresh pool"""
+    factory = recording_factory([])
+    first = factory.client()
+    factory.close()
+    assert factory.client() is not first
+
+
+def test_override_swaps_in_the_in_memory_client(monkeypatch):
+    """Routes read and write the in-memory stand-in inside override()"""
+    fake = InMemorySupabase(users={"token-1": user("user-1", "a@example.com")})
+    monkeypatch.setattr(dependencies, "token_verifier", None)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache())
+    app = FastAPI()
+    app.include_router(profile.router)
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer token-1"}
+
+    with supabase_factory.override(fake):
+        assert client.get("/me", headers=headers).json()["message"] == "Profile not found, please create one"
+        client.post("/profile/update", json="Ada", headers=headers)
+        assert client.get("/me", headers=headers).json() == {"id": "user-1", "full_name": "Ada"}
+        assert client.get("/me", headers={"Authorization": "Bearer other"}).status_code == 401
+    assert fake.tables["profiles"] == [{"id": "user-1", "full_name": "Ada"}]
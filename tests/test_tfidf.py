@@ -0,0 +1,50 @@
+import math
+import random
+from collections import Counter
+
+import numpy as np
+
+from backend.services.grant_catalog import CatalogSnapshot
+from backend.services.match_engine import score_candidates
+from backend.services.normalized_grant import TOKEN_RE, normalize_grant, prepare_user
+from backend.services.tfidf import TfidfModel
+from factories import random_grant, random_user
+
+
+def dense_similarity(descriptions, text):
+    """Cosine similarity computed with plain dense vectors, for comparison"""
+    docs = [Counter(TOKEN_RE.findall(d.lower())) for d in descriptions]
+    vocabulary = sorted(set().union(*docs)) if docs else []
+    n = len(docs)
+    idf = {t: math.log((1 + n) / (1 + sum(t in d for d in docs))) + 1 for t in vocabulary}
+
+    def vector(counts):
+        v = np.array([counts.get(t, 0) * idf[t] for t in vocabulary])
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    query = vector(Counter(TOKEN_RE.findall(text.lower())))
+    return np.array([vector(d) @ query for d in docs])
+
+
+def test_similarity_matches_dense_computation():
+    """The column-wise sparse product equals dense cosine similarity"""
+    rng = random.Random(8)
+    grants = [random_grant(rng) for _ in range(150)]
+    model = TfidfModel([normalize_grant(g) for g in grants])
+    descriptions = [g["description"] for g in grants]
+    for text in ["arts stem", "Research research community", "software engineering Biology", "nothing here"]:
+        assert np.allclose(model.similarity(text), dense_similarity(descriptions, text))
+
+
+def test_similarity_is_opt_in():
+    """Scores are unchanged unless the similarity signal is requested"""
+    rng = random.Random(9)
+    grants = [dict(random_grant(rng), id=f"g{i}") for i in range(200)]
+    snapshot = CatalogSnapshot(grants, None, 0)
+    for _ in range(10):
+        query = prepare_user(random_user(rng))
+        plain = {gid: score for score, gid, _ in score_candidates(snapshot, query)}
+        boosted = {gid: score for score, gid, _ in score_candidates(snapshot, query, similarity=True)}
+        assert all(boosted[gid] >= score for gid, score in plain.items())
+        assert all(score - plain.get(gid, 0) <= 15 + 10 for gid, score in boosted.items())
@@ -0,0 +1,155 @@
+import threading
+import time
+
+import jwt
+import pytest
+
+from backend.services.token_cache import RevokedTokenError, TokenCache
+from factories import make_token
+
+
+
+class Verifier:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, token):
+        self.calls.append(token)
+        time.sleep(self.delay)
+        return jwt.decode(token, options={"verify_signature": False})["sub"]
+
+
+def test_verified_tokens_are_cached():
+    """A second lookup of the same token does not verify it again"""
+    cache, verify = TokenCache(), Verifier()
+    token = make_token()
+    assert cache.get_or_verify(token, verify) == "user-1"
+    assert cache.get_or_verify(token, verify) == "user-1"
+    assert len(verify.calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_entries_expire_with_the_token():
+    """An entry lives for the TTL, but never past the token's exp"""
+    now = [1000.0]
+    cache, verify = TokenCache(ttl=300, clock=lambda: now[0]), Verifier()
+    short, long = make_token(sub="short", exp=1010), make_token(sub="long", exp=5000)
+    cache.get_or_verify(short, verify)
+    cache.get_or_verify(long, verify)
+    now[0] = 1011.0
+    cache.get_or_verify(short, verify)
+    cache.get_or_verify(long, verify)
+    assert verify.calls == [short, long, short]
+    now[0] = 1301.0
+    cache.get_or_verify(long, verify)
+    assert verify.calls == [short, long, short, long]
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Past max_size the least recently used token is dropped"""
+    cache, verify = TokenCache(max_size=2), Verifier()
+    a, b, c = make_token(sub="a"), make_token(sub="b"), make_token(sub="c")
+    for token in (a, b, a, c):
+        cache.get_or_verify(token, verify)
+    cache.get_or_verify(a, verify)
+    cache.get_or_verify(b, verify)
+    assert verify.calls == [a, b, c, b]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_revoked_tokens_are_refused():
+    """A revoked token is refused, even though it still verifies"""
+    cache, verify = TokenCache(), Verifier()
+    token = make_token()
+    cache.get_or_verify(token, verify)
+    cache.revoke(token)
+    with pytest.raises(RevokedTokenError):
+        cache.get_or_verify(token, verify)
+    assert cache.is_revoked(token)
+    assert cache.get_or_verify(make_token(sub="user-2"), verify) == "user-2"
+
+
+def test_revocations_are_capped():
+    """Past max_revoked, the revocations that expire soonest are dropped"""
+    cache = TokenCache(max_revoked=2, clock=lambda: 1000.0)
+    tokens = [make_token(sub=f"user-{i}") for i in range(3)]
+    for token, exp in zip(tokens, (3000, 2000, 4000)):
+        cache.revoke(token, exp)
+    assert [cache.is_revoked(token) for token in tokens] == [True, False, True]
+    assert cache.stats()["revoked"] == 2
+
+
+def test_failures_are_not_cached():
+    """A token that fails verification is verified again next time"""
+    cache, calls = TokenCache(), []
+
+    def verify(token):
+        calls.append(token)
+        raise ValueError("invalid")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.get_or_verify("bad", verify)
+    assert len(calls) == 2
+
+
+def test_concurrent_lookups_share_one_verification():
+    """Parallel requests with one uncached token verify it once"""
+    cache, verify = TokenCache(), Verifier(delay=0.2)
+    token = make_token()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_verify(token, verify))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["user-1"] * 8
+    assert len(verify.calls) == 1
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_logout_revokes_the_token(monkeypatch):
+    """POST /logout makes the token unusable for authenticated routes"""
+    from fastapi import HTTPException
+    from backend import dependencies
+    from backend.routers import auth
+    from backend.services.supabase_client import supabase_factory
+    from fake_supabase import InMemorySupabase, user
+
+    token = make_token()
+    fake = InMemorySupabase(users={token: user("user-1")})
+    monkeypatch.setattr(dependencies, "token_verifier", None)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache())
+    monkeypatch.setattr(auth, "token_cache", dependencies.token_cache)
+
+    with supabase_factory.override(fake):
+        assert dependencies.get_user_from_token("Bearer " + token).id == "user-1"
+        caller = dependencies.get_user_from_token(token)
+        auth.logout(caller, token, fake)
+        for fresh in (False, True):
+            with pytest.raises(HTTPException) as error:
+                dependencies.get_user_from_token(token, fresh=fresh)
+            assert error.value.status_code == 401
+    assert fake.auth.signed_out == [token]
+
+
+def test_logout_requires_a_valid_token(monkeypatch):
+    """POST /logout with a token that does not verify revokes nothing"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend import dependencies
+    from backend.routers import auth
+    from backend.services.supabase_client import supabase_factory
+    from fake_supabase import InMemorySupabase
+
+    monkeypatch.setattr(dependencies, "token_verifier", None)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache())
+    monkeypatch.setattr(auth, "token_cache", dependencies.token_cache)
+    app = FastAPI()
+    app.include_router(auth.router)
+    forged = make_token(exp=int(time.time()) + 10**9)
+    with supabase_factory.override(InMemorySupabase()):
+        response = TestClient(app).post("/logout", headers={"Authorization": f"Bearer {forged}"})
+    assert response.status_code == 401
+    assert dependencies.token_cache.stats()["revoked"] == 0
@@ -0,0 +1,170 @@
+import threading
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from backend.services.supabase_client import supabase_factory
+from backend.services.token_cache import TokenCache
+from backend.services.token_verifier import TokenVerifier, fetch_jwks
+from factories import SECRET, make_token
+
+
+
+def es256_jwks(kid):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return private_key, {**jwk, "kid": kid, "alg": "ES256", "use": "sig"}
+
+
+def test_hs256_token_is_verified_locally():
+    """A token signed with the project secret resolves to its user"""
+    user = TokenVerifier(secret=SECRET).user(make_token())
+    assert (user.id, user.email) == ("user-1", "a@example.com")
+
+
+@pytest.mark.parametrize("token", [
+    make_token(exp=int(time.time()) - 3600),
+    make_token(aud="anon"),
+    make_token(sub=None),
+    make_token(key="another-secret-that-is-also-long-enough-32"),
+    "not-a-jwt",
+])
+def test_bad_tokens_are_rejected(token):
+    """Expired, wrong-audience, subject-less, forged and malformed tokens fail"""
+    with pytest.raises(jwt.InvalidTokenError):
+        TokenVerifier(secret=SECRET).verify(token)
+
+
+def test_jwks_keys_are_cached_and_refreshed_for_new_key_ids():
+    """The JWKS is fetched once, and again only when an unknown kid appears"""
+    first_key, first_jwk = es256_jwks("k1")
+    second_key, second_jwk = es256_jwks("k2")
+    published = {"keys": [first_jwk]}
+    fetches = []
+
+    def fetch_keys():
+        fetches.append(1)
+        return published
+
+    now = [0.0]
+    verifier = TokenVerifier(
+        jwks_url="https://example.supabase.co/auth/v1/.well-known/jwks.json",
+        fetch_keys=fetch_keys, refresh_interval=0, clock=lambda: now[0],
+    )
+    for _ in range(3):
+        assert verifier.verify(make_token(first_key, "ES256", {"kid": "k1"}))["sub"] == "user-1"
+    assert len(fetches) == 1
+
+    published = {"keys": [first_jwk, second_jwk]}
+    now[0] = 100.0
+    assert verifier.verify(make_token(second_key, "ES256", {"kid": "k2"}))["sub"] == "user-1"
+    assert len(fetches) == 2
+
+    # unknown key ids do not hammer the JWKS endpoint
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(make_token(second_key, "ES256", {"kid": "k3"}))
+    assert len(fetches) == 2
+
+
+def test_unreachable_jwks_is_an_invalid_token():
+    """A JWKS fetch failure surfaces as InvalidTokenError so callers can fall back"""
+    key, _ = es256_jwks("k1")
+
+    def fetch_keys():
+        raise OSError("connection refused")
+
+    verifier = TokenVerifier(jwks_url="https://example", fetch_keys=fetch_keys, refresh_interval=0)
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(make_token(key, "ES256", {"kid": "k1"}))
+
+
+def test_failed_jwks_fetches_back_off():
+    """After a failed fetch, tokens are rejected without refetching until the interval passes"""
+    key, jwk = es256_jwks("k1")
+    fetches = []
+
+    def fetch_keys():
+        fetches.append(1)
+        if len(fetches) == 1:
+            raise OSError("connection refused")
+        return {"keys": [jwk]}
+
+    now = [0.0]
+    verifier = TokenVerifier(
+        jwks_url="https://example", fetch_keys=fetch_keys, refresh_interval=0, clock=lambda: now[0],
+    )
+    for _ in range(5):
+        with pytest.raises(jwt.InvalidTokenError):
+            verifier.verify(make_token(key, "ES256", {"kid": "k1"}))
+    assert len(fetches) == 1
+    now[0] = 31.0
+    assert verifier.verify(make_token(key, "ES256", {"kid": "k1"}))["sub"] == "user-1"
+    assert len(fetches) == 2
+
+
+def test_concurrent_verifications_share_one_fetch():
+    """Parallel first tokens wait for a single JWKS download"""
+    key, jwk = es256_jwks("k1")
+    fetches = []
+
+    def fetch_keys():
+        fetches.append(1)
+        time.sleep(0.2)
+        return {"keys": [jwk]}
+
+    verifier = TokenVerifier(jwks_url="https://example", fetch_keys=fetch_keys, refresh_interval=0)
+    token = make_token(key, "ES256", {"kid": "k1"})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(verifier.verify(token)["sub"])) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["user-1"] * 8
+    assert len(fetches) == 1
+
+
+def test_jwks_is_downloaded_over_the_shared_pool(monkeypatch):
+    """fetch_jwks goes through the Supabase factory's httpx client"""
+    _, jwk = es256_jwks("k1")
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"keys": [jwk]})
+
+    monkeypatch.setattr(supabase_factory, "_http", httpx.Client(transport=httpx.MockTransport(handler)))
+    assert fetch_jwks("https://x.supabase.co/auth/v1/.well-known/jwks.json") == {"keys": [jwk]}
+    assert seen == ["/auth/v1/.well-known/jwks.json"]
+
+
+def test_from_env():
+    """Without a secret or project URL there is nothing to verify with"""
+    assert TokenVerifier.from_env({}) is None
+    verifier = TokenVerifier.from_env({"SUPABASE_URL": "https://x.supabase.co/", "SUPABASE_JWT_SECRET": SECRET})
+    assert verifier.jwks_url == "https://x.supabase.co/auth/v1/.well-known/jwks.json"
+    assert verifier.secret == SECRET
+
+
+def test_profile_routes_fall_back_to_supabase(monkeypatch):
+    """get_user_from_token only calls GoTrue when local verification fails"""
+    from backend import dependencies
+
+    calls = []
+
+    class FakeAuth:
+        def get_user(self, token):
+            calls.append(token)
+            return type("Response", (), {"user": type("User", (), {"id": "remote-user"})()})()
+
+    monkeypatch.setattr(dependencies, "token_verifier", TokenVerifier(secret=SECRET))
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache())
+    with supabase_factory.override(type("Client", (), {"auth": FakeAuth()})()):
+        assert dependencies.get_user_from_token("Bearer " + make_token()).id == "user-1"
+        assert calls == []
+        assert dependencies.get_user_from_token(make_token(aud="anon")).id == "remote-user"
+        assert dependencies.get_user_from_token(make_token(), fresh=True).id == "remote-user"
+    assert len(calls) == 2
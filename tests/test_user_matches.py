@@ -0,0 +1,178 @@
+import random
+
+from backend.services.grant_catalog import GrantCatalog
+from backend.services.user_matches import MatchRecomputer, UserMatchStore, check_consistency
+from factories import random_grant, random_user, tuned_rules
+
+
+class FakeTable:
+    def __init__(self, rng, n):
+        self.rng = rng
+        self.grants = [self.make_grant(f"grant-{i}", 1) for i in range(n)]
+
+    def make_grant(self, grant_id, version):
+        return dict(random_grant(self.rng), id=grant_id, updated_at=f"2025-01-01T00:00:{version:02d}")
+
+    def fetch(self):
+        return [dict(g) for g in self.grants]
+
+
+def make_recomputer(seed=11, grants=200, users=60, limit=100, rules=None):
+    rng = random.Random(seed)
+    table = FakeTable(rng, grants)
+    catalog = GrantCatalog(table.fetch, ttl=0)
+    profiles = {f"user-{i}": random_user(rng) for i in range(users)}
+    store = UserMatchStore(limit)
+    recomputer = MatchRecomputer(store, catalog, lambda: list(profiles.items()), rules)
+    recomputer.ensure_loaded()
+    return rng, table, catalog, profiles, store, recomputer
+
+
+def test_rebuild_is_consistent():
+    """A fresh rebuild matches full re-scoring"""
+    _, _, catalog, profiles, store, _ = make_recomputer()
+    assert check_consistency(store, catalog.snapshot(), profiles.items()) == []
+
+
+def test_grant_updates_rescore_incrementally():
+    """Changed, new and deleted grants reach the store through sync()"""
+    rng, table, catalog, profiles, store, recomputer = make_recomputer()
+    table.grants[3] = table.make_grant("grant-3", 2)
+    table.grants.append(table.make_grant("grant-new", 2))
+    del table.grants[10]
+    recomputer.sync()
+    assert check_consistency(store, catalog.snapshot(), profiles.items()) == []
+    assert all("grant-10" not in store.scores(user_id) for user_id in profiles)
+
+
+def test_zero_weight_fields_do_not_make_candidates():
+    """Under tuned rules, grant updates only reach users a weighted rule can match"""
+    rules = tuned_rules()
+    rng, table, catalog, profiles, store, recomputer = make_recomputer(rules=rules)
+    for i in range(0, 40, 3):
+        table.grants[i] = table.make_grant(f"grant-{i}", 2)
+    recomputer.sync()
+    assert check_consistency(store, catalog.snapshot(), profiles.items(), rules=rules) == []
+    assert "location_eligible" not in recomputer._by_tag
+
+
+def test_profile_change_recomputes_one_user():
+    """Saving a profile only rewrites that user's matches"""
+    rng, _, catalog, profiles, store, recomputer = make_recomputer()
+    before = {user_id: store.scores(user_id) for user_id in profiles}
+    profiles["user-0"] = random_user(rng)
+    recomputer.profile_changed("user-0", profiles["user-0"])
+    assert check_consistency(store, catalog.snapshot(), profiles.items()) == []
+    assert all(store.scores(user_id) == before[user_id] for user_id in profiles if user_id != "user-0")
+
+
+def test_consistency_checker_reports_drift():
+    """Tampering with the store shows up as a mismatch"""
+    _, _, catalog, profiles, store, _ = make_recomputer()
+    user_id = next(u for u in profiles if store.scores(u))
+    grant_id, score = next(iter(store.scores(user_id).items()))
+    store.set_score(user_id, grant_id, score + 5)
+    assert check_consistency(store, catalog.snapshot(), profiles.items()) == [(user_id, grant_id, score + 5, score)]
+
+
+def test_page_ranks_stored_matches():
+    """Reads come back ranked by score, then grant id"""
+    store = UserMatchStore()
+    store.replace_user("u", {"b": 50, "a": 50, "c": 90})
+    page, cursor = store.page("u", 2)
+    assert page == [(90, "c"), (50, "a")]
+    assert store.page("u", 2, after=(50, "a")) == ([(50, "b")], None)
+    assert cursor == "50:a"
+
+
+def test_store_keeps_the_top_matches_through_updates():
+    """With a small limit, updates, inserts and deletes keep each user's top matches"""
+    rng, table, catalog, profiles, store, recomputer = make_recomputer(limit=5)
+    assert all(len(store.scores(user_id)) <= 5 for user_id in profiles)
+    for round in range(3, 6):
+        for i in rng.sample(range(len(table.grants)), 40):
+            table.grants[i] = table.make_grant(table.grants[i]["id"], round)
+        del table.grants[:10]
+        recomputer.sync()
+        assert check_consistency(store, catalog.snapshot(), profiles.items()) == []
+
+
+def test_reads_past_the_kept_matches_return_none():
+    """A user with more matches than the limit only has the first pages stored"""
+    store = UserMatchStore(limit=2)
+    store.replace_user("u", {"a": 10, "b": 20, "c": 30})
+    assert store.page("u", 1) == ([(30, "c")], "30:c")
+    assert store.page("u", 2) == ([(30, "c"), (20, "b")], "20:b")
+    assert store.page("u", 2, after=(20, "b")) is None
+    assert store.ranked("u") is None
+
+
+def test_unknown_users_are_not_served_from_the_store():
+    """A user the store has never seen gets None, so the live path runs"""
+    store = UserMatchStore()
+    store.replace_user("known", {})
+    assert store.page("new-user", 20) is None
+    assert store.ranked("new-user") is None
+    assert store.page("known", 20) == ([], None)
+
+
+def test_sync_picks_up_profiles_written_elsewhere():
+    """New, edited and deleted profiles reach the store through sync()"""
+    rng, _, catalog, profiles, store, recomputer = make_recomputer()
+    profiles["user-0"] = random_user(rng)
+    profiles["user-new"] = random_user(rng)
+    del profiles["user-1"]
+    recomputer.sync()
+    assert check_consistency(store, catalog.snapshot(), profiles.items()) == []
+    assert "user-new" in store.user_ids() and "user-1" not in store.user_ids()
+
+
+def test_profile_saves_during_a_rebuild_do_not_wait_for_it():
+    """A save that arrives before the first rebuild is applied when it ends"""
+    rng = random.Random(3)
+    table = FakeTable(rng, 50)
+    catalog = GrantCatalog(table.fetch, ttl=0)
+    profiles = {"user-0": random_user(rng)}
+    store = UserMatchStore()
+    recomputer = MatchRecomputer(store, catalog, lambda: list(profiles.items()))
+    late = random_user(rng)
+    recomputer.profile_changed("user-1", late)
+    assert not recomputer.ready and store.user_ids() == set()
+    recomputer.ensure_loaded()
+    profiles["user-1"] = late
+    assert recomputer.ready
+    assert check_consistency(store, catalog.snapshot(), profiles.items()) == []
+
+
+def test_me_matches_scores_on_the_fly_until_the_first_build(monkeypatch):
+    """Before the worker's first rebuild, /me/matches ranks the stored profile directly"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend import dependencies
+    from backend.routers import profile
+    from backend.services.match_engine import rank_matches
+    from backend.services.supabase_client import supabase_factory
+    from backend.services.token_cache import TokenCache
+    from fake_supabase import InMemorySupabase, user
+
+    rng = random.Random(5)
+    table = FakeTable(rng, 100)
+    stored = dict(random_user(rng), id="user-1")
+    fake = InMemorySupabase({"profiles": [stored]}, users={"token-1": user("user-1")})
+    catalog = GrantCatalog(table.fetch, ttl=60)
+    recomputer = MatchRecomputer(UserMatchStore(), catalog, lambda: [])
+    monkeypatch.setattr(dependencies, "token_verifier", None)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache())
+    monkeypatch.setattr(profile, "grant_catalog", catalog)
+    monkeypatch.setattr(profile, "match_recomputer", recomputer)
+    monkeypatch.setattr(profile, "user_matches", recomputer.store)
+    monkeypatch.setattr(profile, "match_cache", None)
+    app = FastAPI()
+    app.include_router(profile.router)
+
+    with supabase_factory.override(fake):
+        body = TestClient(app).get("/me/matches?limit=5", headers={"Authorization": "Bearer token-1"}).json()
+    expected, _ = rank_matches(catalog.snapshot(), profile.profile_to_user(stored), 5)
+    assert not recomputer.ready
+    assert [(g["score"], g["id"]) for g in body["grants"]] == [(score, grant_id) for score, grant_id, _ in expected]